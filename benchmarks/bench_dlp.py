@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+""" Overhead benchmarks for dirlistproc.
+
+Builds a synthetic input tree in a temporary directory and measures directory traversal, filtering, output name
+generation and complete runs with a processor that does nothing, in every execution mode.  Each case runs in a fresh
+process so that its peak RSS can be reported.  Results are written as JSON so that they can be compared across
+releases.
+
+    > python benchmarks/bench_dlp.py --files 100000 --depth 3 --fanout 8 -o bench.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dirlistproc import DirectoryListProcessor
+
+try:
+    import resource
+except ImportError:                     # Windows
+    resource = None
+
+SIZE_DISTRIBUTIONS = ('empty', 'fixed', 'lognormal')
+
+
+def noop_proc(_, __, ___) -> bool:
+    return True
+
+
+def noop_batch_proc(pairs, _) -> None:
+    return None
+
+
+async def noop_async_proc(_, __, ___) -> bool:
+    return True
+
+
+def make_tree(root: str, nfiles: int, depth: int=2, fanout: int=10, suffixes: Optional[Dict[str, float]]=None,
+              sizes: str='empty', mean_size: int=4096, seed: int=42) -> int:
+    """ Build a synthetic input tree
+    :param root: Directory to build the tree in
+    :param nfiles: Number of files
+    :param depth: Number of directory levels below root
+    :param fanout: Number of subdirectories in each directory
+    :param suffixes: Suffix to relative frequency.  Default: all ".xml"
+    :param sizes: File size distribution - "empty", "fixed" (every file mean_size) or "lognormal" around mean_size.
+                  Files are extended without writing, so large sizes cost little disk
+    :param mean_size: Mean file size in bytes
+    :param seed: Random seed, so a tree can be rebuilt exactly
+    :return: Total size of the files
+    """
+    rng = random.Random(seed)
+    suffixes = suffixes or {'.xml': 1.0}
+    dirs = [root]
+    level = [root]
+    for _ in range(depth):
+        level = [os.path.join(parent, 'd{}'.format(n)) for parent in level for n in range(fanout)]
+        dirs += level
+    for dirpath in dirs:
+        os.makedirs(dirpath, exist_ok=True)
+    names, weights = list(suffixes), list(suffixes.values())
+    total = 0
+    for n in range(nfiles):
+        if sizes == 'empty':
+            size = 0
+        elif sizes == 'fixed':
+            size = mean_size
+        else:
+            # Lognormal with the requested mean and a long tail
+            size = int(rng.lognormvariate(0, 1) * mean_size / 1.6487)
+        path = os.path.join(dirs[n % len(dirs)], 'f{}{}'.format(n, rng.choices(names, weights)[0]))
+        with open(path, 'wb') as f:
+            if size:
+                f.truncate(size)
+        total += size
+    return total
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """ Peak resident set size of this process and any worker processes it waited for, in KiB """
+    if resource is None:
+        return None
+    scale = 1024 if sys.platform == 'darwin' else 1        # macOS reports bytes, Linux KiB
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) // scale
+
+
+def _dlp(root: str, suffix: str, *args: str) -> DirectoryListProcessor:
+    return DirectoryListProcessor(['-id', root, '-od', os.path.join(root, '.out')] + list(args), "Benchmark",
+                                  suffix, '.out')
+
+
+def bench_os_walk(root: str, suffix: str, _: int) -> int:
+    return sum(len(files) for _, _, files in os.walk(root))
+
+
+def bench_walk(root: str, suffix: str, _: int) -> int:
+    return sum(1 for _ in DirectoryListProcessor._walk(root))
+
+
+def bench_check_filter(root: str, suffix: str, _: int) -> Tuple[int, float]:
+    dlp = _dlp(root, suffix)
+    matcher = dlp._matcher(None, None)
+    entries = [(dirpath, entry.name) for dirpath, entry in DirectoryListProcessor._walk(root)]
+    start = time.perf_counter()
+    for dirpath, name in entries:
+        dlp._check_filter(name, dirpath, None, None, matcher, '')
+    return len(entries), time.perf_counter() - start
+
+
+def bench_outfile_name(root: str, suffix: str, _: int) -> Tuple[int, float]:
+    dlp = _dlp(root, suffix)
+    entries = [(dirpath, entry.name) for dirpath, entry in DirectoryListProcessor._walk(root)]
+    start = time.perf_counter()
+    for dirpath, name in entries:
+        dlp._outfile_name(dirpath, name)
+    return len(entries), time.perf_counter() - start
+
+
+def bench_iter_jobs(root: str, suffix: str, _: int) -> int:
+    return sum(1 for _ in _dlp(root, suffix).iter_jobs())
+
+
+def bench_run_serial(root: str, suffix: str, _: int) -> int:
+    return _dlp(root, suffix).run(noop_proc)[0]
+
+
+def bench_run_thread(root: str, suffix: str, jobs: int) -> int:
+    return _dlp(root, suffix).run(noop_proc, jobs=jobs, executor='thread')[0]
+
+
+def bench_run_process(root: str, suffix: str, jobs: int) -> int:
+    return _dlp(root, suffix).run(noop_proc, jobs=jobs, executor='process')[0]
+
+
+def bench_run_batched(root: str, suffix: str, jobs: int) -> int:
+    return _dlp(root, suffix).run_batched(noop_batch_proc, batch_size=100, jobs=jobs)[0]
+
+
+def bench_run_async(root: str, suffix: str, _: int) -> int:
+    return asyncio.run(_dlp(root, suffix).run_async(noop_async_proc))[0]
+
+
+CASES = {
+    'os.walk': bench_os_walk,
+    'walk': bench_walk,
+    'check_filter': bench_check_filter,
+    'outfile_name': bench_outfile_name,
+    'iter_jobs': bench_iter_jobs,
+    'run-serial': bench_run_serial,
+    'run-thread': bench_run_thread,
+    'run-process': bench_run_process,
+    'run-batched': bench_run_batched,
+    'run-async': bench_run_async,
+}                                       # type: Dict[str, Callable]
+
+
+def _measure(name: str, root: str, suffix: str, jobs: int, results: multiprocessing.Queue) -> None:
+    """ Run one case in a child process and report (files, seconds, peak RSS).  Cases that only time part of their
+    work return their own elapsed time """
+    try:
+        start = time.perf_counter()
+        rslt = CASES[name](root, suffix, jobs)
+        nfiles, elapsed = rslt if isinstance(rslt, tuple) else (rslt, time.perf_counter() - start)
+        results.put((nfiles, elapsed, _peak_rss_kb()))
+    except BaseException as e:
+        results.put(e)
+        raise
+
+
+def measure(name: str, root: str, suffix: str, jobs: int, repeat: int, poll: float=1.0) -> dict:
+    """ Run a case repeat times, each in a fresh process, and report the fastest.  A child that dies without reporting
+    (killed, out of memory, a result that couldn't be pickled) raises RuntimeError.
+    :param poll: Seconds between checks that the child is still running
+    """
+    ctx = multiprocessing.get_context('spawn')
+    runs = []
+    for _ in range(repeat):
+        results = ctx.Queue()
+        child = ctx.Process(target=_measure, args=(name, root, suffix, jobs, results))
+        child.start()
+        while True:
+            try:
+                rslt = results.get(timeout=poll)
+                break
+            except queue.Empty:
+                if not child.is_alive():
+                    # The child can exit between the timeout and the check, so look one last time
+                    try:
+                        rslt = results.get(timeout=poll)
+                        break
+                    except queue.Empty:
+                        raise RuntimeError("Benchmark {} exited with code {} without a result"
+                                           .format(name, child.exitcode)) from None
+        child.join()
+        if isinstance(rslt, BaseException):
+            raise RuntimeError("Benchmark {} failed".format(name)) from rslt
+        runs.append(rslt)
+    nfiles, seconds, peak_rss_kb = min(runs, key=lambda run: run[1])
+    return dict(name=name, files=nfiles, seconds=seconds, files_per_second=nfiles / seconds if seconds else None,
+                peak_rss_kb=max((run[2] for run in runs if run[2] is not None), default=None))
+
+
+def _suffix_mix(value: str) -> Dict[str, float]:
+    """ argparse type for ".xml:3,.txt:1" """
+    rval = {}
+    for item in value.split(','):
+        suffix, _, weight = item.partition(':')
+        rval[suffix] = float(weight or 1)
+    return rval
+
+
+def main(argv: Optional[List[str]]=None) -> List[dict]:
+    parser = argparse.ArgumentParser(description="Measure dirlistproc traversal, filtering and dispatch overhead")
+    parser.add_argument("--files", help="Number of files (default: %(default)s)", type=int, default=20000)
+    parser.add_argument("--depth", help="Directory levels (default: %(default)s)", type=int, default=2)
+    parser.add_argument("--fanout", help="Subdirectories per directory (default: %(default)s)", type=int, default=10)
+    parser.add_argument("--suffixes", help="Suffix mix, e.g. .xml:3,.txt:1.  The first suffix is processed "
+                        "(default: .xml:1)", type=_suffix_mix, default={'.xml': 1.0})
+    parser.add_argument("--sizes", help="File size distribution (default: %(default)s)", choices=SIZE_DISTRIBUTIONS,
+                        default='empty')
+    parser.add_argument("--mean-size", help="Mean file size in bytes (default: %(default)s)", type=int, default=4096)
+    parser.add_argument("-j", "--jobs", help="Workers for the pooled cases (default: CPU count)", type=int,
+                        default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", help="Runs per case - the fastest is reported (default: %(default)s)", type=int,
+                        default=3)
+    parser.add_argument("--cases", help="Comma separated cases to run (default: all).  Choices: " + ', '.join(CASES),
+                        default=','.join(CASES))
+    parser.add_argument("--tree", help="Build (or reuse) the tree here instead of a temporary directory")
+    parser.add_argument("-o", "--output", help="JSON results file (default: stdout)")
+    opts = parser.parse_args(argv)
+    cases = opts.cases.split(',')
+    for case in cases:
+        if case not in CASES:
+            parser.error("Unknown case: {}".format(case))
+
+    with tempfile.TemporaryDirectory(prefix='dlp_bench_') as tmpdir:
+        root = opts.tree or tmpdir
+        if not os.path.isdir(root) or not os.listdir(root):
+            make_tree(root, opts.files, opts.depth, opts.fanout, opts.suffixes, opts.sizes, opts.mean_size)
+        suffix = next(iter(opts.suffixes))
+        results = []
+        for case in cases:
+            results.append(measure(case, root, suffix, opts.jobs, opts.repeat))
+            print("{name:>14}: {files:>9,} files {seconds:9.3f}s {files_per_second:>12,.0f} files/s  "
+                  "peak RSS {peak_rss_kb} KiB".format(**results[-1]), file=sys.stderr)
+
+    report = dict(python=platform.python_version(), implementation=platform.python_implementation(),
+                  platform=platform.platform(), cpu_count=os.cpu_count(), time=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  tree=dict(files=opts.files, depth=opts.depth, fanout=opts.fanout, suffixes=opts.suffixes,
+                            sizes=opts.sizes, mean_size=opts.mean_size),
+                  jobs=opts.jobs, repeat=opts.repeat, results=results)
+    text = json.dumps(report, indent=2)
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return results
+
+
+if __name__ == '__main__':
+    main()
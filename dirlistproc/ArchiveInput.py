@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from typing import Iterator, Optional, Union
+
+
+class ArchiveInput:
+    def __init__(self, path: str):
+        """ The regular files in a tar (optionally compressed) or zip archive, read in a single pass.  Members are
+        listed in archive order and each one can be copied to a scratch file while it is the current member, so a
+        compressed tar is only ever decompressed once and only the members in use are on disk.
+        :param path: Archive file
+        """
+        self.path = path
+        self._zip = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+        self._tar = tarfile.open(path, mode='r|*') if self._zip is None else None
+        self._current = None            # type: Optional[Union[tarfile.TarInfo, zipfile.ZipInfo]]
+        self._nextracted = 0
+        self._scratch_dir = None        # type: Optional[str]
+
+    def members(self) -> Iterator[str]:
+        """ Generate the names of the regular files in the archive, in the order they are stored.  Each becomes the
+        current member until the next is requested. """
+        if self._zip is not None:
+            for info in sorted(self._zip.infolist(), key=lambda info: info.header_offset):
+                if not info.is_dir():
+                    self._current = info
+                    yield info.filename
+        else:
+            for info in self._tar:
+                if info.isfile():
+                    self._current = info
+                    yield info.name
+        self._current = None
+
+    def extract(self) -> str:
+        """ Copy the current member to a scratch file with the member's modification time.  The scratch file name
+        ends with the member's file name.
+        :return: Scratch file name
+        """
+        info = self._current
+        if info is None:
+            raise ValueError("No current archive member")
+        if self._scratch_dir is None:
+            self._scratch_dir = tempfile.mkdtemp(prefix='dlp_archive_')
+        if self._zip is not None:
+            name, src = info.filename, self._zip.open(info)
+            mtime = time.mktime(info.date_time + (0, 0, -1))
+        else:
+            name, src = info.name, self._tar.extractfile(info)
+            mtime = info.mtime
+        tmp = os.path.join(self._scratch_dir, '{}-{}'.format(self._nextracted, name.rstrip('/').rsplit('/', 1)[-1]))
+        self._nextracted += 1
+        with src, open(tmp, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.utime(tmp, (mtime, mtime))
+        return tmp
+
+    @staticmethod
+    def release(tmp: str) -> None:
+        """ Remove a scratch file returned by extract """
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """ Close the archive and remove any scratch files that are left """
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+        if self._scratch_dir is not None:
+            shutil.rmtree(self._scratch_dir, ignore_errors=True)
+            self._scratch_dir = None
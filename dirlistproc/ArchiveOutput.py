@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from typing import Dict, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+TAR_MODES = (('.tar', 'w|'), ('.tar.gz', 'w|gz'), ('.tgz', 'w|gz'), ('.tar.bz2', 'w|bz2'), ('.tar.xz', 'w|xz'),
+             ('.tar.zst', 'w|'))
+
+
+def archive_format(path: str) -> Optional[str]:
+    """ Determine the kind of archive to write from its file name
+    :param path: Archive file name
+    :return: ".zip", one of the TAR_MODES suffixes or None if the suffix isn't recognized
+    """
+    if path.endswith('.zip'):
+        return '.zip'
+    return next((suffix for suffix, _ in TAR_MODES if path.endswith(suffix)), None)
+
+
+class ArchiveOutput:
+    def __init__(self, path: str):
+        """ Collect the output files of a run into one tar (optionally compressed) or zip archive instead of creating
+        each one separately.  Every output is written to a scratch file and appended to the archive once its proc
+        succeeds, so the archive is written sequentially by a single writer whatever the workers are.  Output file
+        names are the archive path followed by the member path.
+        :param path: Archive file.  The format comes from the suffix - see archive_format
+        """
+        self.path = path
+        self._prefix = os.path.join(path, '')
+        fmt = archive_format(path)
+        if fmt is None:
+            raise ValueError("Unrecognized archive suffix: {}".format(path))
+        self._zip = None                # type: Optional[zipfile.ZipFile]
+        self._tar = None                # type: Optional[tarfile.TarFile]
+        self._zst = None
+        if fmt == '.zip':
+            self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+        elif fmt == '.tar.zst':
+            if zstandard is None:
+                raise ValueError("Writing {} requires the zstandard package".format(path))
+            self._zst = zstandard.ZstdCompressor().stream_writer(open(path, 'wb'))
+            self._tar = tarfile.open(fileobj=self._zst, mode='w|')
+        else:
+            self._tar = tarfile.open(path, mode=dict(TAR_MODES)[fmt])
+        self._scratch_dir = tempfile.mkdtemp(prefix='dlp_archive_')
+        self._staged = {}               # type: Dict[str, str]
+        self._nstaged = 0
+
+    def stage(self, ofn: str) -> str:
+        """ Return the scratch file to write ofn to.  The scratch file name ends with the file name of ofn.
+        :param ofn: Output file name below the archive path
+        :return: Scratch file name
+        """
+        tmp = os.path.join(self._scratch_dir, '{}-{}'.format(self._nstaged, os.path.basename(ofn)))
+        self._nstaged += 1
+        self._staged[tmp] = ofn
+        return tmp
+
+    def finish(self, tmp: str, success: bool) -> str:
+        """ Append a scratch file to the archive if its proc succeeded and wrote it, then remove it
+        :param tmp: Scratch file name returned by stage
+        :param success: proc result
+        :return: Output file name
+        """
+        ofn = self._staged.pop(tmp)
+        if not os.path.exists(tmp):
+            return ofn
+        if success:
+            member = ofn[len(self._prefix):] if ofn.startswith(self._prefix) else os.path.basename(ofn)
+            member = member.replace(os.sep, '/')
+            if self._zip is not None:
+                self._zip.write(tmp, member)
+            else:
+                self._tar.add(tmp, member)
+        os.remove(tmp)
+        return ofn
+
+    def close(self) -> None:
+        """ Finish the archive and remove the outputs of any jobs that never finished """
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+        if self._zst is not None:
+            self._zst.close()
+        shutil.rmtree(self._scratch_dir, ignore_errors=True)
+        self._staged.clear()
@@ -27,11 +27,192 @@
 # OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
 # OF THE POSSIBILITY OF SUCH DAMAGE.
 import argparse
+import asyncio
+import copy
+import heapq
+import mmap
+import multiprocessing.util
 import os
+import posixpath
+import re
 import sys
+import threading
+import time
 import traceback
 import shlex
-from typing import List, Optional, Callable, Tuple
+import zlib
+from collections import deque
+from contextlib import ExitStack, closing, contextmanager
+from functools import partial
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Optional, Callable, Tuple, Iterator, Iterable, Awaitable, Dict, NamedTuple, Any, \
+    Sequence, Union
+
+from dirlistproc.ArchiveInput import ArchiveInput
+from dirlistproc.ArchiveOutput import ArchiveOutput, archive_format, zstandard
+from dirlistproc.FileMatcher import FileMatcher
+from dirlistproc.Journal import Journal
+from dirlistproc.Manifest import Manifest, MANIFEST_NAME, hash_file
+from dirlistproc.OutputStager import OutputStager
+from dirlistproc.Profiling import Profiling
+from dirlistproc.Progress import Progress
+from dirlistproc.RunStats import RunStats, Timing
+from dirlistproc.UrlFetcher import UrlFetcher
+from dirlistproc.Watcher import Watcher, WatchedEntry
+
+# Number of threads used to hash input files for --manifest and how far ahead of the processors they can get
+HASH_WORKERS = 4
+HASH_LOOKAHEAD = 64
+
+# Per-worker state for pooled execution.  Each worker gets its own copy of the processor and the proc function once,
+# at startup, so individual tasks only carry the input and output file names.
+_worker = threading.local()
+
+
+EXECUTORS = ('process', 'thread')
+SCHEDULES = ('walk', 'largest-first')
+INPUT_MODES = ('path', 'mmap')
+PROGRESS_MODES = ('estimate', 'count')
+LIST_DETECT_BYTES = 1 << 16
+
+# The value of each option when it isn't on the command line.  from_config starts from these
+OPTION_DEFAULTS = dict(infile=None, indir=None, inarchive=None, infile_list=None, prefetch=None, fetch_cache=None,
+                       outfile=None, outdir=None, outarchive=None, flatten=False, stoponerror=False, jobs=None,
+                       executor=None, incremental=False, manifest=None, journal=None, resume=False, shard=None,
+                       schedule=None, lookahead=1000, atomic=False, fsync=False, stats=None, profile=None,
+                       profile_sample=None, progress=None, include=None, exclude=None, include_re=None,
+                       exclude_re=None, exclude_dir=None, watch=None, settle=2.0)
+_OPTION_CHOICES = dict(executor=EXECUTORS, schedule=SCHEDULES, progress=PROGRESS_MODES)
+_NUMERIC_OPTIONS = dict(jobs=int, lookahead=int, prefetch=int, profile_sample=int, watch=float, settle=float)
+_LIST_OPTIONS = ('infile', 'outfile', 'include', 'exclude', 'include_re', 'exclude_re', 'exclude_dir')
+
+
+class Job(NamedTuple):
+    """ A unit of work - the arguments to a single proc call """
+    ifn: Optional[str]          # Input file name.  None means stdin
+    ofn: Optional[str]          # Output file name.  None means no output was specified
+    index: int                  # Position of the job in the job stream, starting at 0
+
+
+def _shard(value: str) -> Tuple[int, int]:
+    """ Argument type for --shard
+    :param value: "K/N"
+    :return: tuple - (K, N)
+    """
+    try:
+        k, n = (int(e) for e in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("shard must be of the form K/N")
+    return _shard_range(k, n)
+
+
+def _shard_range(k: int, n: int) -> Tuple[int, int]:
+    """ Check that shard K/N is one of the N shards
+    :return: tuple - (K, N)
+    """
+    if not 1 <= k <= n:
+        raise argparse.ArgumentTypeError("shard K/N must have 1 <= K <= N")
+    return k, n
+
+
+def _init_worker(dlp: "DirectoryListProcessor", proc: Callable,
+                 initializer: Optional[Callable[[argparse.Namespace], Any]]=None,
+                 finalizer: Optional[Callable[[Any], None]]=None,
+                 contexts: Optional[List[Any]]=None) -> None:
+    """ Pool initializer - record the processor and proc function for this worker and set up its context
+    :param dlp: DirectoryListProcessor (a copy in the case of a process pool)
+    :param proc: Process to invoke
+    :param initializer: Function to build the worker context from the options
+    :param finalizer: Function to release the worker context
+    :param contexts: Thread pools only - list to add the context to, so the caller can finalize it.  Process workers
+                     finalize their own context when they exit.
+    """
+    if initializer or finalizer:
+        # The worker gets its own options, so the context isn't shared with other workers
+        dlp = copy.copy(dlp)
+        dlp.opts = copy.copy(dlp.opts)
+        context = initializer(dlp.opts) if initializer else None
+        dlp.opts.worker_context = context
+        if finalizer:
+            if contexts is None:
+                multiprocessing.util.Finalize(None, finalizer, args=(context,), exitpriority=10)
+            else:
+                contexts.append(context)
+    _worker.dlp = dlp
+    _worker.proc = proc
+
+
+def _worker_call(job: "Job") -> bool:
+    """ Invoke the worker's processor on a single file
+    :param job: Job to run
+    :return: true means process was successful
+    """
+    return _worker.dlp._call_proc(_worker.proc, job.ifn, job.ofn)
+
+
+def _input_size(ifn: Optional[str]) -> int:
+    """ Size of an input file for --stats.  Stdin, URLs and files that can't be read count as 0 """
+    try:
+        return os.stat(ifn).st_size if ifn is not None and '://' not in ifn else 0
+    except OSError:
+        return 0
+
+
+def _timed_call(call: Callable[["Job"], bool], job: "Job") -> Tuple[bool, Timing]:
+    """ Invoke call on a job, measuring it for --stats
+    :param call: Function that runs the job
+    :param job: Job to run
+    :return: Result of call and its timing
+    """
+    nbytes = _input_size(job.ifn)
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+    success = call(job)
+    return success, Timing(time.perf_counter() - start_wall, time.thread_time() - start_cpu, nbytes)
+
+
+def _timed_batch_call(call: Callable[[List["Job"]], List[bool]], batch: List["Job"]) \
+        -> Tuple[List[bool], List[Timing]]:
+    """ Invoke call on a batch of jobs, measuring it for --stats.  Each job is charged an equal share of the time
+    :param call: Function that runs the batch
+    :param batch: Jobs to run
+    :return: Results of call and the timing of each job
+    """
+    sizes = [_input_size(job.ifn) for job in batch]
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+    successes = call(batch)
+    wall = (time.perf_counter() - start_wall) / len(batch)
+    cpu = (time.thread_time() - start_cpu) / len(batch)
+    return successes, [Timing(wall, cpu, nbytes) for nbytes in sizes]
+
+
+def _worker_call_batch(batch: List["Job"]) -> List[bool]:
+    """ Invoke the worker's batch processor on a list of files
+    :param batch: Jobs to run
+    :return: Success of each job
+    """
+    return _worker.dlp._call_batch_proc(_worker.proc, batch)
+
+
+class _MappedProc:
+    """ Adapter for the "mmap" input mode.  Maps the input file read-only and passes the mapping to the processor as a
+    fourth argument, closing it as soon as the processor returns.  Stdin and URLs get None and empty files get b''
+    (an empty file can't be mapped).  The adapter is picklable whenever proc is.
+    """
+    def __init__(self, proc: Callable[[Optional[str], Optional[str], argparse.Namespace, Any], Optional[bool]]):
+        self.proc = proc
+
+    def __call__(self, ifn: Optional[str], ofn: Optional[str], opts: argparse.Namespace) -> Optional[bool]:
+        if ifn is None or '://' in ifn:
+            return self.proc(ifn, ofn, opts, None)
+        with open(ifn, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return self.proc(ifn, ofn, opts, b'')
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    data.madvise(mmap.MADV_SEQUENTIAL)
+                return self.proc(ifn, ofn, opts, data)
 
 
 def _parser_exit(parser: argparse.ArgumentParser, proc: "DirectoryListProcessor", _=0,
@@ -48,14 +229,16 @@ def _parser_exit(parser: argparse.ArgumentParser, proc: "DirectoryListProcessor"
 
 
 class DirectoryListProcessor:
-    def __init__(self, args: Optional[List[str]], description: str, infile_suffix: Optional[str],
+    def __init__(self, args: Optional[List[str]], description: str,
+                 infile_suffix: Optional[Union[str, Sequence[str]]],
                  outfile_suffix: Optional[str], addargs: Optional[Callable[[argparse.ArgumentParser], None]]=None,
                  postparse: Optional[Callable[[argparse.Namespace], None]]=None,
                  noexit: bool=False, fromfile_prefix_chars: Optional[str]=None):
         """ Build a directory list processor
         :param args: Input arguments such as supplied from sys.argv.  None means use sys.argv
         :param description: Description of the function.  Appears in a help string
-        :param infile_suffix: Suffix filter on input file.  If absent, all files not starting with "." pass
+        :param infile_suffix: Suffix filter on input file.  May be a list of suffixes, any of which pass.  If absent, all
+        files not starting with "." pass
         :param outfile_suffix: Suffix to add to output file.  If absent, name is same as input
         :param addargs: Function to add arguments before parsing.  Signature: addargs(parser: argparse.ArgumentParser)
         :param postparse: Function to review arguments post parsing.  Signature: postparse(opts: argparse.Namespace)
@@ -63,37 +246,290 @@ class DirectoryListProcessor:
         succesful_parse is set to False
         :param fromfile_prefix_chars: parser file prefix characters
         """
-        self.infile_suffix = infile_suffix
-        self.outfile_suffix = outfile_suffix
-        self.successful_parse = True
+        self._init_state(infile_suffix, outfile_suffix)
         self.fromfile_prefix_chars = fromfile_prefix_chars if fromfile_prefix_chars else ""
         self.parser = argparse.ArgumentParser(description=description, fromfile_prefix_chars=fromfile_prefix_chars)
         self.parser.add_argument("-i", "--infile", help="Input file(s)", nargs="*")
         self.parser.add_argument("-id", "--indir", help="Input directory")
+        self.parser.add_argument("--inarchive", help="Process the files in this tar (optionally compressed) or zip "
+                                 "archive without unpacking it", metavar="PATH")
+        self.parser.add_argument("--infile-list", help="Read the input files from this file (\"-\" for stdin), one "
+                                 "per line or NUL separated as written by find -print0.  Relative names are relative "
+                                 "to the input directory if there is one", metavar="PATH")
+        self.parser.add_argument("--prefetch", help="Download http and https input URLs on N threads (default: 4) "
+                                 "ahead of the processors, reusing connections to each host.  proc is given the "
+                                 "downloaded file", type=int, nargs="?", const=4, metavar="N")
+        self.parser.add_argument("--fetch-cache", help="With --prefetch, keep the downloads in this directory and "
+                                 "reuse them on later runs", metavar="DIR")
         self.parser.add_argument("-o", "--outfile", help="Output file(s)", nargs="*")
         self.parser.add_argument("-od", "--outdir", help="Output directory")
+        self.parser.add_argument("--outarchive", help="Write the output files into this archive instead of an output "
+                                 "directory.  The format comes from the suffix: .zip, .tar, .tar.gz, .tgz, .tar.bz2, "
+                                 ".tar.xz or .tar.zst", metavar="PATH")
         self.parser.add_argument("-f", "--flatten", help="Flatten output directory", action="store_true")
         self.parser.add_argument("-s", "--stoponerror", help="Stop on processing error", action="store_true")
+        self.parser.add_argument("-j", "--jobs", help="Number of parallel workers (0 means pick based on CPU count)",
+                                 type=int)
+        self.parser.add_argument("--executor", help="Type of parallel worker (default: process)",
+                                 choices=EXECUTORS)
+        self.parser.add_argument("--incremental", help="Skip input files whose output is newer than the input",
+                                 action="store_true")
+        self.parser.add_argument("--manifest", help="Skip input files whose content hasn't changed since they were "
+                                 "last processed successfully.  Default file: OUTDIR/" + MANIFEST_NAME,
+                                 nargs="?", const="", metavar="PATH")
+        self.parser.add_argument("--journal", help="Record each finished input file in this file", metavar="PATH")
+        self.parser.add_argument("--resume", help="Skip the input files recorded as successful in the journal",
+                                 action="store_true")
+        self.parser.add_argument("--shard", help="Only process shard K of N.  Input files are assigned to shards by "
+                                 "their path relative to the input directory", type=_shard, metavar="K/N")
+        self.parser.add_argument("--schedule", help="Order in which input files are started (default: walk)",
+                                 choices=SCHEDULES)
+        self.parser.add_argument("--lookahead", help="Number of input files that largest-first chooses from "
+                                 "(default: %(default)s)", type=int, default=1000)
+        self.parser.add_argument("--atomic", help="Write each output file under a temporary name and only move it "
+                                 "into place if proc succeeds.  Output directories are created as needed",
+                                 action="store_true")
+        self.parser.add_argument("--fsync", help="With --atomic, flush each output file to disk before it is moved "
+                                 "into place", action="store_true")
+        self.parser.add_argument("--stats", help="Write timing and throughput statistics for the run as JSON to this "
+                                 "file (default: stderr)", nargs="?", const="", metavar="PATH")
+        self.parser.add_argument("--profile", help="Profile the processor calls, merging the profiles of every worker "
+                                 "into this pstats file", metavar="PATH")
+        self.parser.add_argument("--profile-sample", help="With --profile, only profile every K'th input file "
+                                 "(default: 1)", type=int, metavar="K")
+        self.parser.add_argument("--progress", help="Show progress on stderr if it is a terminal.  \"count\" counts "
+                                 "the input files in the background to get the total early.  Otherwise the total is "
+                                 "known once every input file has been found", nargs="?", const="estimate",
+                                 choices=PROGRESS_MODES)
+        self.parser.add_argument("--watch", help="After the first pass, keep processing the files that are added to "
+                                 "or change in the input directory until interrupted.  Changes are picked up with "
+                                 "inotify if it is available, otherwise by rescanning every SECONDS (default: 2)",
+                                 type=float, nargs="?", const=2.0, metavar="SECONDS")
+        self.parser.add_argument("--settle", help="With --watch, only process a file once it has been left alone for "
+                                 "this long (default: %(default)s)", type=float, default=2.0, metavar="SECONDS")
+        self.parser.add_argument("--include", help="Only process input files matching this glob.  A glob with a "
+                                 "\"/\" matches the path relative to the input directory, otherwise the file name",
+                                 action="append", metavar="GLOB")
+        self.parser.add_argument("--exclude", help="Skip input files matching this glob", action="append",
+                                 metavar="GLOB")
+        self.parser.add_argument("--include-re", help="Only process input files whose relative path contains a match "
+                                 "for this regular expression", action="append", metavar="REGEX")
+        self.parser.add_argument("--exclude-re", help="Skip input files whose relative path contains a match for this "
+                                 "regular expression", action="append", metavar="REGEX")
+        self.parser.add_argument("--exclude-dir", help="Don't search directories matching this glob",
+                                 action="append", metavar="GLOB")
         if addargs is not None:
             addargs(self.parser)
         if noexit:
             self.parser.exit = lambda *args: _parser_exit(self.parser, self, *args)
         self.opts = self.parser.parse_args(self.decode_file_args(args if args is not None else sys.argv[1:]))
         if self.successful_parse:
-            if self.opts.indir and not os.path.isdir(self.opts.indir):
-                if os.path.exists(self.opts.indir):
-                    self.parser.error("{} is not a directory".format(self.opts.indir))
-                else:
-                    self.parser.error("Directory {} does not exist".format(self.opts.indir))
-                return
+            self._validate(postparse)
 
-            n_infiles = len(self.opts.infile) if self.opts.infile else 0
-            n_outfiles = len(self.opts.outfile) if self.opts.outfile else 0
-            if (n_infiles > 1 or n_outfiles > 1) and n_infiles != n_outfiles and n_outfiles > 1:
-                self.parser.error("Number of input and output files must match")
+    @classmethod
+    def from_config(cls,
+                    infile_suffix: Optional[Union[str, Sequence[str]]]=None,
+                    outfile_suffix: Optional[str]=None,
+                    postparse: Optional[Callable[[argparse.Namespace], None]]=None,
+                    extra_options: Optional[Dict[str, Any]]=None,
+                    **options: Any) -> "DirectoryListProcessor":
+        """ Build a directory list processor from option values rather than arguments.  No argument parser is built,
+        so this is the cheap way to make processors in a service or a test.  The options are checked as they are for
+        the command line, but a problem raises ValueError.
+        :param infile_suffix: Suffix filter on input file.  May be a list of suffixes.  If absent, all files not
+        starting with "." pass
+        :param outfile_suffix: Suffix to add to output file.  If absent, name is same as input
+        :param postparse: Function to review the options.  Signature: postparse(opts: argparse.Namespace)
+        :param extra_options: Values of the processor's own options - the ones an addargs function would add to the
+        parser.  They are put in opts as they are
+        :param options: Option values, named as they are in opts - e.g. indir="data", outdir="out", flatten=True.
+        Anything not supplied takes its command line default.  A single string is accepted for the list options,
+        numbers may be given as strings and shard may be given as "K/N" or (K, N)
+        :return: Directory list processor
+        """
+        unknown = set(options) - set(OPTION_DEFAULTS)
+        if unknown:
+            raise TypeError("Unknown option(s): {}".format(', '.join(sorted(unknown))))
+        clashes = set(extra_options or {}) & set(OPTION_DEFAULTS)
+        if clashes:
+            raise TypeError("extra_options can't set built-in option(s): {}".format(', '.join(sorted(clashes))))
+        opts = dict(OPTION_DEFAULTS, **options)
+        for name in _LIST_OPTIONS:
+            if isinstance(opts[name], str):
+                opts[name] = [opts[name]]
+        for name, option_type in _NUMERIC_OPTIONS.items():
+            value = opts[name]
+            if value is None:
+                continue
+            try:
+                converted = option_type(value)
+            except (TypeError, ValueError):
+                converted = None
+            if converted is None or isinstance(value, bool) or (isinstance(value, float) and converted != value):
+                raise ValueError("{} must be {}".format(name, "an integer" if option_type is int else "a number"))
+            opts[name] = converted
+        shard = opts['shard']
+        try:
+            if isinstance(shard, str):
+                opts['shard'] = _shard(shard)
+            elif shard is not None:
+                if not (isinstance(shard, (tuple, list)) and len(shard) == 2 and
+                        all(isinstance(e, int) and not isinstance(e, bool) for e in shard)):
+                    raise argparse.ArgumentTypeError("shard must be of the form K/N or (K, N)")
+                opts['shard'] = _shard_range(*shard)
+        except argparse.ArgumentTypeError as e:
+            raise ValueError(str(e))
+        for name, choices in _OPTION_CHOICES.items():
+            if opts[name] is not None and opts[name] not in choices:
+                raise ValueError("{} must be one of {}".format(name, ', '.join(choices)))
+        dlp = cls.__new__(cls)
+        dlp._init_state(infile_suffix, outfile_suffix)
+        dlp.fromfile_prefix_chars = ""
+        dlp.parser = None
+        dlp.opts = argparse.Namespace(**dict(extra_options or {}, **opts))
+        dlp._validate(postparse)
+        return dlp
+
+    def _init_state(self, infile_suffix: Optional[Union[str, Sequence[str]]], outfile_suffix: Optional[str]) -> None:
+        """ Set up everything except the options """
+        self.infile_suffix = infile_suffix
+        self.outfile_suffix = outfile_suffix
+        self.successful_parse = True
+        self.nskipped = 0
+        self._manifest = None           # type: Optional[Manifest]
+        self._digests = {}              # type: Dict[str, Tuple[str, int]]
+        self._journal = None            # type: Optional[Journal]
+        self._stager = None             # type: Optional[Union[OutputStager, ArchiveOutput]]
+        self._stats = None              # type: Optional[RunStats]
+        self._profiling = None          # type: Optional[Profiling]
+        self._progress = None           # type: Optional[Progress]
+        self._archive = None            # type: Optional[ArchiveInput]
+        self._archive_members = {}      # type: Dict[str, str]
+        self._fetcher = None            # type: Optional[UrlFetcher]
+        self._fetched = {}              # type: Dict[str, List[str]]
+        self._watch_entries = None      # type: Optional[List[WatchedEntry]]
+        self._watch_round = 0
+        self._watch_stop = threading.Event()
+        self._watch_workers = None      # type: Optional[ExitStack]
+        self._watch_pools = {}          # type: Dict[Tuple[str, int], Optional[Executor]]
+
+    def _validate(self, postparse: Optional[Callable[[argparse.Namespace], None]]) -> None:
+        """ Check the options for consistency, then hand them to postparse
+        :param postparse: Function to review the options.  Signature: postparse(opts: argparse.Namespace)
+        """
+        if self.opts.indir and not os.path.isdir(self.opts.indir):
+            if os.path.exists(self.opts.indir):
+                self._error("{} is not a directory".format(self.opts.indir))
+            else:
+                self._error("Directory {} does not exist".format(self.opts.indir))
+            return
+
+        if self.opts.infile_list and self.opts.infile:
+            self._error("--infile-list can't be combined with -i")
+            return
+        if self.opts.inarchive:
+            if not os.path.isfile(self.opts.inarchive):
+                self._error("Archive {} does not exist".format(self.opts.inarchive))
+                return
+            if self.opts.infile or self.opts.infile_list or self.opts.indir:
+                self._error("--inarchive can't be combined with -i, -id or --infile-list")
                 return
-            if postparse is not None:
-                postparse(self.opts)
+            # Members are unpacked in a single pass, so nothing may look at an input before its turn or reorder them
+            if self.opts.incremental or self.opts.manifest is not None or self.opts.schedule == 'largest-first':
+                self._error("--inarchive can't be combined with --incremental, --manifest or --schedule "
+                            "largest-first")
+                return
+        if self.opts.prefetch is not None and self.opts.prefetch < 1:
+            self._error("--prefetch must be at least 1")
+            return
+        if self.opts.fetch_cache and self.opts.prefetch is None:
+            self._error("--fetch-cache requires --prefetch")
+            return
+        if self.opts.outarchive:
+            fmt = archive_format(self.opts.outarchive)
+            if fmt is None:
+                self._error("Unrecognized archive type: {}".format(self.opts.outarchive))
+                return
+            if fmt == '.tar.zst' and zstandard is None:
+                self._error("{} requires the zstandard package".format(self.opts.outarchive))
+                return
+            if self.opts.outfile or self.opts.outdir:
+                self._error("--outarchive can't be combined with -o or -od")
+                return
+            # The archive is written afresh on every run, so nothing may be left out because an earlier run did it
+            if self.opts.atomic or self.opts.incremental or self.opts.manifest is not None or self.opts.resume:
+                self._error("--outarchive can't be combined with --atomic, --incremental, --manifest or --resume")
+                return
+        n_infiles = len(self.opts.infile) if self.opts.infile else 0
+        n_outfiles = len(self.opts.outfile) if self.opts.outfile else 0
+        if (n_infiles > 1 or n_outfiles > 1) and n_infiles != n_outfiles and n_outfiles > 1:
+            self._error("Number of input and output files must match")
+            return
+        if self.opts.jobs is not None and self.opts.jobs < 0:
+            self._error("Number of jobs must be zero or more")
+            return
+        if self.opts.manifest == "" and not self.opts.outdir:
+            self._error("--manifest requires a file name if there is no output directory")
+            return
+        if self.opts.resume and not self.opts.journal:
+            self._error("--resume requires --journal")
+            return
+        if self.opts.lookahead < 1:
+            self._error("--lookahead must be at least 1")
+            return
+        if self.opts.fsync and not self.opts.atomic:
+            self._error("--fsync requires --atomic")
+            return
+        if self.opts.profile_sample is not None:
+            if not self.opts.profile:
+                self._error("--profile-sample requires --profile")
+                return
+            if self.opts.profile_sample < 1:
+                self._error("--profile-sample must be at least 1")
+                return
+        if self.opts.watch is not None:
+            if not self.opts.indir or self.opts.infile or self.opts.infile_list:
+                self._error("--watch requires -id and can't be combined with -i or --infile-list")
+                return
+            if self.opts.watch <= 0 or self.opts.settle < 0:
+                self._error("--watch must be more than zero and --settle can't be negative")
+                return
+        for regex in (self.opts.include_re or []) + (self.opts.exclude_re or []):
+            try:
+                re.compile(regex)
+            except re.error as e:
+                self._error("Invalid regular expression {}: {}".format(regex, e))
+                return
+        if postparse is not None:
+            postparse(self.opts)
+
+    def _error(self, message: str) -> None:
+        """ Report an invalid option through the parser or, if there isn't one, as a ValueError """
+        if self.parser is None:
+            raise ValueError(message)
+        self.parser.error(message)
+
+    def __getstate__(self) -> dict:
+        """ Pickle support for worker processes.  The parser is only needed at construction time and may carry
+        unpicklable hooks, so it is left behind. """
+        state = self.__dict__.copy()
+        state['parser'] = None
+        state['_manifest'] = None
+        state['_digests'] = {}
+        state['_journal'] = None
+        state['_stager'] = None
+        state['_stats'] = None
+        state['_profiling'] = None
+        state['_progress'] = None
+        state['_archive'] = None
+        state['_archive_members'] = {}
+        state['_fetcher'] = None
+        state['_fetched'] = {}
+        state['_watch_entries'] = None
+        state['_watch_stop'] = None
+        state['_watch_workers'] = None
+        state['_watch_pools'] = {}
+        return state
 
     def decode_file_args(self, argv: List[str]) -> List[str]:
         """
@@ -104,12 +540,17 @@ class DirectoryListProcessor:
         :param argv: raw options list
         :return: options list with file references replaced
         """
-        for arg in [arg for arg in argv if arg[0] in self.fromfile_prefix_chars]:
-            argv.remove(arg)
-            with open(arg[1:]) as config_file:
-                argv += shlex.split(config_file.read())
-                return self.decode_file_args(argv)
-        return argv
+        # File contents go at the end, as argparse does.  A queue keeps this linear in the number of arguments
+        rval = []
+        pending = deque(argv)
+        while pending:
+            arg = pending.popleft()
+            if arg and arg[0] in self.fromfile_prefix_chars:
+                with open(arg[1:]) as config_file:
+                    pending.extend(shlex.split(config_file.read()))
+            else:
+                rval.append(arg)
+        return rval
 
     @staticmethod
     def _proc_error(ifn: str, e: Exception) -> None:
@@ -117,8 +558,7 @@ class DirectoryListProcessor:
         :param ifn: Input file name
         :param e: Exception to report
         """
-        type_, value_, traceback_ = sys.exc_info()
-        traceback.print_tb(traceback_, file=sys.stderr)
+        traceback.print_tb(e.__traceback__, file=sys.stderr)
         print(file=sys.stderr)
         print("***** ERROR: %s" % ifn, file=sys.stderr)
         print(str(e), file=sys.stderr)
@@ -140,21 +580,85 @@ class DirectoryListProcessor:
             self._proc_error(ifn, e)
         return True if rslt or rslt is None else False
 
+    def _call_batch_proc(self,
+                         batch_proc: Callable[[List[Tuple[Optional[str], Optional[str]]], argparse.Namespace],
+                                              Optional[Iterable[Any]]],
+                         batch: List[Job]) -> List[bool]:
+        """ Call a batch processor and intercept anything that goes wrong
+        :param batch_proc: Batch process to call
+        :param batch: Jobs to pass
+        :return: Success of each job
+        """
+        pairs = [(job.ifn, job.ofn) for job in batch]
+        try:
+            rslts = batch_proc(pairs, self.opts)
+            rslts = [None] * len(pairs) if rslts is None else list(rslts)
+            if len(rslts) != len(pairs):
+                raise ValueError("Batch processor returned {} results for {} files".format(len(rslts), len(pairs)))
+        except Exception as e:
+            for ifn, _ in pairs:
+                self._proc_error(ifn, e)
+            return [False] * len(pairs)
+        successes = []
+        for (ifn, _), rslt in zip(pairs, rslts):
+            if isinstance(rslt, Exception):
+                self._proc_error(ifn, rslt)
+                successes.append(False)
+            else:
+                successes.append(True if rslt or rslt is None else False)
+        return successes
+
+    def _infile_suffixes(self) -> Tuple[str, ...]:
+        """ The input suffix(es) as a tuple.  Empty if there is no suffix filter """
+        if isinstance(self.infile_suffix, str):
+            return (self.infile_suffix, ) if self.infile_suffix else ()
+        return tuple(self.infile_suffix) if self.infile_suffix else ()
+
+    def _matcher(self,
+                 file_filter: Optional[Callable[[str], bool]],
+                 file_filter_2: Optional[Callable[[Optional[str], str, argparse.Namespace], bool]]) -> FileMatcher:
+        """ Compile the input suffix(es) and the --include/--exclude options into a FileMatcher.  Names that begin
+        with "." are only passed if there is a user supplied filter to make the decision. """
+        return FileMatcher(self._infile_suffixes() or ('', ),
+                           self.opts.include or (), self.opts.exclude or (),
+                           self.opts.include_re or (), self.opts.exclude_re or (),
+                           self.opts.exclude_dir or (),
+                           skip_hidden=not (file_filter or file_filter_2))
+
     def _check_filter(self,
                       fn: Optional[str],
                       dirpath: Optional[str],
                       file_filter: Optional[Callable[[str], bool]],
-                      file_filter_2: Optional[Callable[[Optional[str], str, argparse.Namespace], bool]]) -> bool:
-        rval = (fn is None or ('://' in fn or fn.endswith(self.infile_suffix))) and \
-           (not file_filter or file_filter(fn)) and \
-           (not file_filter_2 or file_filter_2(fn, dirpath if dirpath is not None else '', self.opts)) and \
-           (file_filter or file_filter_2 or fn is None or not fn.startswith('.'))
-        return rval
+                      file_filter_2: Optional[Callable[[Optional[str], str, argparse.Namespace], bool]],
+                      matcher: Optional[FileMatcher]=None,
+                      relpath: Optional[str]=None) -> bool:
+        """ Determine whether an input file passes the built-in rules and then the user supplied filters
+        :param fn: File name.  None means stdin
+        :param dirpath: Directory containing fn
+        :param file_filter: Additional filter for testing file names, types, etc.
+        :param file_filter_2: File filter that includes directory, filename and opts
+        :param matcher: Compiled built-in rules.  Built from the options if absent
+        :param relpath: Path to match --include and --exclude against.  Defaults to fn
+        """
+        if fn is not None:
+            matcher = matcher if matcher is not None else self._matcher(file_filter, file_filter_2)
+            relpath = relpath if relpath is not None else fn
+            if not (matcher.selected(relpath) if '://' in fn else matcher.matches(fn, relpath)):
+                return False
+        return (not file_filter or file_filter(fn)) and \
+            (not file_filter_2 or file_filter_2(fn, dirpath if dirpath is not None else '', self.opts))
 
     def run(self,
             proc: Callable[[Optional[str], Optional[str], argparse.Namespace], Optional[bool]],
             file_filter: Optional[Callable[[str], bool]]=None,
-            file_filter_2: Optional[Callable[[Optional[str], str, argparse.Namespace], bool]]=None) \
+            file_filter_2: Optional[Callable[[Optional[str], str, argparse.Namespace], bool]]=None,
+            jobs: Optional[int]=None,
+            executor: Optional[str]=None,
+            entry_filter: Optional[Callable[[os.DirEntry, argparse.Namespace], bool]]=None,
+            dependencies: Optional[Callable[[str, str, argparse.Namespace], Iterable[str]]]=None,
+            initializer: Optional[Callable[[argparse.Namespace], Any]]=None,
+            finalizer: Optional[Callable[[Any], None]]=None,
+            input_mode: str='path') \
             -> Tuple[int, int]:
         """ Run the directory list processor calling a function per file.
         :param proc: Process to invoke. Args: input_file_name, output_file_name, argparse options. Return pass or fail.
@@ -162,43 +666,967 @@ class DirectoryListProcessor:
         :param file_filter: Additional filter for testing file names, types, etc.
         :param file_filter_2: File filter that includes directory, filename and opts
                         (separate for backwards compatibility)
+        :param jobs: Number of workers.  Overrides the --jobs option.  None or 1 processes the files one at a time
+                     in the calling thread, 0 picks a number based on the CPU count.
+        :param executor: Type of worker - "process" (default) or "thread".  Overrides the --executor option.
+                     Process workers require proc and the options to be picklable.  Thread workers share them.
+        :param entry_filter: Filter on the os.DirEntry of each candidate file in the input directory.  Applied after
+                     the other filters.  The entry caches its stat information.
+        :param dependencies: With --incremental, additional files that the output depends on.
+                     Args: input_file_name, output_file_name, argparse options.  Returns the dependent file names
+        :param initializer: Function called once per worker (once in all for serial processing) with the options to
+                     build expensive processor state.  The result is available to proc as opts.worker_context and is
+                     never shared between workers.  Must be picklable for process workers.  With --watch, the
+                     workers are kept from one round to the next.
+        :param finalizer: Function called with each worker context when the worker is done with it
+        :param input_mode: "path" (default) passes proc the input file name.  "mmap" also maps the input file
+                     read-only and passes the mmap as a fourth argument, so large files can be parsed without being
+                     read into memory.  The mapping is closed when proc returns, so proc must not keep it (or any
+                     memoryview of it).  Stdin and URLs are passed None.
+        :return: tuple - (number of files passed to proc: int, number of files that passed proc).  The number of
+                 files skipped by --resume, --incremental or --manifest is recorded in nskipped.
+        """
+        if input_mode not in INPUT_MODES:
+            raise ValueError("Unknown input mode: {}".format(input_mode))
+        if self.opts.watch and self._watch_entries is None:
+            return self._watch(partial(self.run, proc, file_filter, file_filter_2, jobs, executor, entry_filter,
+                                       dependencies, initializer, finalizer, input_mode))
+        if input_mode == 'mmap':
+            proc = _MappedProc(proc)
+        stop = threading.Event()
+        try:
+            input_jobs = self._plan(file_filter, file_filter_2, entry_filter, dependencies)
+            call = lambda job: self._call_proc(proc, job.ifn, job.ofn)
+            worker_call = _worker_call
+            if self.opts.profile:
+                self._profiling = Profiling(self.opts.profile, self.opts.profile_sample or 1)
+                call = partial(self._profiling.call, call)
+                worker_call = partial(self._profiling.call, _worker_call)
+            if self._stats:
+                call = partial(_timed_call, call)
+                worker_call = partial(_timed_call, worker_call)
+            results = self._execute(proc, input_jobs, jobs, executor, stop, call, worker_call,
+                                    initializer, finalizer)
+            with closing(results):
+                return self._count_results(results, stop, timed=self._stats is not None)
+        finally:
+            self._end_run()
+
+    def run_batched(self,
+                    batch_proc: Callable[[List[Tuple[Optional[str], Optional[str]]], argparse.Namespace],
+                                         Optional[Iterable[Any]]],
+                    batch_size: int=100,
+                    file_filter: Optional[Callable[[str], bool]]=None,
+                    file_filter_2: Optional[Callable[[Optional[str], str, argparse.Namespace], bool]]=None,
+                    jobs: Optional[int]=None,
+                    executor: Optional[str]=None,
+                    entry_filter: Optional[Callable[[os.DirEntry, argparse.Namespace], bool]]=None,
+                    dependencies: Optional[Callable[[str, str, argparse.Namespace], Iterable[str]]]=None,
+                    initializer: Optional[Callable[[argparse.Namespace], Any]]=None,
+                    finalizer: Optional[Callable[[Any], None]]=None) \
+            -> Tuple[int, int]:
+        """ Run the directory list processor calling a function per batch of files.  Batches are taken from the same
+        job stream as run, so the filters and other options all apply.
+        :param batch_proc: Batch process to invoke. Args: list of (input_file_name, output_file_name), argparse
+                     options.  Returns a result per file, in the same order.  A result is pass or fail as for run,
+                     or an Exception, which is reported as the reason that file failed.  No return means everything
+                     passed.  If batch_proc raises an exception, every file in the batch fails.
+        :param batch_size: Maximum number of files per call
+        :param file_filter: Additional filter for testing file names, types, etc.
+        :param file_filter_2: File filter that includes directory, filename and opts
+        :param jobs: Number of workers, as for run.  Each worker handles one batch at a time
+        :param executor: Type of worker, as for run
+        :param entry_filter: Filter on the os.DirEntry of each candidate file in the input directory
+        :param dependencies: With --incremental, additional files that the output depends on
+        :param initializer: Function to build each worker's context, as for run
+        :param finalizer: Function to release each worker's context, as for run
+        :return: tuple - (number of files passed to batch_proc: int, number of files that passed batch_proc)
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if self.opts.watch and self._watch_entries is None:
+            return self._watch(partial(self.run_batched, batch_proc, batch_size, file_filter, file_filter_2, jobs,
+                                       executor, entry_filter, dependencies, initializer, finalizer))
+        stop = threading.Event()
+        try:
+            batches = self._batches(self._plan(file_filter, file_filter_2, entry_filter, dependencies), batch_size)
+            call = lambda batch: self._call_batch_proc(batch_proc, batch)
+            worker_call = _worker_call_batch
+            if self.opts.profile:
+                self._profiling = Profiling(self.opts.profile, self.opts.profile_sample or 1)
+                call = partial(self._profiling.call, call)
+                worker_call = partial(self._profiling.call, _worker_call_batch)
+            if self._stats:
+                call = partial(_timed_batch_call, call)
+                worker_call = partial(_timed_batch_call, worker_call)
+            results = self._execute(batch_proc, batches, jobs, executor, stop, call, worker_call,
+                                    initializer, finalizer)
+            with closing(results):
+                if self._stats:
+                    return self._count_results(((job, rslt) for batch, (successes, timings) in results
+                                                for job, rslt in zip(batch, zip(successes, timings))), stop, timed=True)
+                return self._count_results(((job, success) for batch, successes in results
+                                            for job, success in zip(batch, successes)), stop)
+        finally:
+            self._end_run()
+
+    @staticmethod
+    def _batches(input_jobs: Iterable[Job], batch_size: int) -> Iterator[List[Job]]:
+        """ Group the jobs into lists of batch_size or fewer """
+        batch = []
+        for job in input_jobs:
+            batch.append(job)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _execute(self,
+                 proc: Callable,
+                 items: Iterable[Any],
+                 jobs: Optional[int],
+                 executor: Optional[str],
+                 stop: threading.Event,
+                 call: Callable[[Any], Any],
+                 worker_call: Callable[[Any], Any],
+                 initializer: Optional[Callable[[argparse.Namespace], Any]]=None,
+                 finalizer: Optional[Callable[[Any], None]]=None) -> Iterator[Tuple[Any, Any]]:
+        """ Process the work items serially or in a pool of workers, depending on jobs and executor
+        :param proc: Process that call and worker_call invoke
+        :param items: Work items - jobs or batches of jobs
+        :param jobs: Number of workers.  If absent, use the --jobs option
+        :param executor: Type of worker.  If absent, use the --executor option
+        :param stop: Set by the caller when no further work should be started
+        :param call: Function to process an item in the calling thread
+        :param worker_call: Module level function to process an item in a pool worker
+        :param initializer: Function to build each worker's context
+        :param finalizer: Function to release each worker's context
+        :return: Generator of (item, result)
+        """
+        executor = executor or self.opts.executor or 'process'
+        if executor not in EXECUTORS:
+            raise ValueError("Unknown executor: {}".format(executor))
+        njobs = self._njobs(jobs, executor)
+        with self._workers(proc, njobs, executor, initializer, finalizer) as pool:
+            if pool is None:
+                yield from self._serial_results(items, stop, call)
+            else:
+                yield from self._pooled_results(pool, njobs, items, stop, worker_call)
+
+    @contextmanager
+    def _workers(self,
+                 proc: Callable,
+                 njobs: int,
+                 executor: str,
+                 initializer: Optional[Callable[[argparse.Namespace], Any]],
+                 finalizer: Optional[Callable[[Any], None]]) -> Iterator[Optional[Executor]]:
+        """ The workers for a run.  Under --watch they are started by the first round and kept for the later ones,
+        so the pool and the worker contexts last as long as the watch does.
+        :param proc: Process that the pool workers invoke
+        :param njobs: Number of workers.  1 means the calling thread
+        :param executor: Type of worker
+        :param initializer: Function to build each worker's context
+        :param finalizer: Function to release each worker's context
+        :return: The pool, or None when processing in the calling thread (with its worker context set up)
+        """
+        if self._watch_workers is None:
+            with self._new_workers(proc, njobs, executor, initializer, finalizer) as pool:
+                yield pool
+        else:
+            key = (executor, njobs)
+            if key not in self._watch_pools:
+                self._watch_pools[key] = self._watch_workers.enter_context(
+                    self._new_workers(proc, njobs, executor, initializer, finalizer))
+            yield self._watch_pools[key]
+
+    @contextmanager
+    def _new_workers(self,
+                     proc: Callable,
+                     njobs: int,
+                     executor: str,
+                     initializer: Optional[Callable[[argparse.Namespace], Any]],
+                     finalizer: Optional[Callable[[Any], None]]) -> Iterator[Optional[Executor]]:
+        """ Start the workers, as for _workers, and shut them down on exit """
+        if njobs == 1:
+            with self._worker_context(initializer, finalizer):
+                yield None
+        elif executor == 'thread':
+            contexts = []
+            try:
+                with ThreadPoolExecutor(max_workers=njobs, initializer=_init_worker,
+                                        initargs=(self, proc, initializer, finalizer, contexts)) as pool:
+                    yield pool
+            finally:
+                if finalizer:
+                    for context in contexts:
+                        finalizer(context)
+        else:
+            with ProcessPoolExecutor(max_workers=njobs, initializer=_init_worker,
+                                     initargs=(self, proc, initializer, finalizer)) as pool:
+                yield pool
+
+    @contextmanager
+    def _worker_context(self,
+                        initializer: Optional[Callable[[argparse.Namespace], Any]],
+                        finalizer: Optional[Callable[[Any], None]]) -> Iterator[None]:
+        """ Set up and release the worker context when processing in the calling thread
+        :param initializer: Function to build the context from the options.  The result is in opts.worker_context
+        :param finalizer: Function to release the context
+        """
+        if not initializer and not finalizer:
+            yield
+            return
+        self.opts.worker_context = initializer(self.opts) if initializer else None
+        try:
+            yield
+        finally:
+            context = self.opts.worker_context
+            del self.opts.worker_context
+            if finalizer:
+                finalizer(context)
+
+    async def run_async(self,
+                        proc: Callable[[Optional[str], Optional[str], argparse.Namespace], Awaitable[Optional[bool]]],
+                        file_filter: Optional[Callable[[str], bool]]=None,
+                        file_filter_2: Optional[Callable[[Optional[str], str, argparse.Namespace], bool]]=None,
+                        concurrency: int=100,
+                        entry_filter: Optional[Callable[[os.DirEntry, argparse.Namespace], bool]]=None,
+                        dependencies: Optional[Callable[[str, str, argparse.Namespace], Iterable[str]]]=None,
+                        initializer: Optional[Callable[[argparse.Namespace], Any]]=None,
+                        finalizer: Optional[Callable[[Any], None]]=None) \
+            -> Tuple[int, int]:
+        """ Run the directory list processor with a coroutine per file, all on the current event loop.
+        :param proc: Coroutine function to invoke. Args: input_file_name, output_file_name, argparse options.
+                     Return pass or fail.  No return also means pass
+        :param file_filter: Additional filter for testing file names, types, etc.
+        :param file_filter_2: File filter that includes directory, filename and opts
+        :param concurrency: Maximum number of proc coroutines in flight at any one time
+        :param entry_filter: Filter on the os.DirEntry of each candidate file in the input directory
+        :param dependencies: With --incremental, additional files that the output depends on
+        :param initializer: Function to build the context shared by all of the coroutines, as for run
+        :param finalizer: Function to release the context, as for run
+        :return: tuple - (number of files passed to proc that ran to completion: int, number of files that passed proc)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if self.opts.profile:
+            # The coroutines interleave on one thread, so a profile can't be attributed to any one of them
+            raise ValueError("--profile isn't supported by run_async")
+        if self.opts.watch and self._watch_entries is None:
+            return await self._watch_async(partial(self.run_async, proc, file_filter, file_filter_2, concurrency,
+                                                   entry_filter, dependencies, initializer, finalizer))
+        nfiles = 0
+        nsuccess = 0
+        stop = False
+        pending = {}
+        exhausted = False
+        with self._workers(proc, 1, 'thread', initializer, finalizer):
+            try:
+                input_jobs = self._plan(file_filter, file_filter_2, entry_filter, dependencies)
+                timed = self._stats is not None
+                call = self._timed_call_proc_async if timed else self._call_proc_async
+                while True:
+                    while not exhausted and not stop and len(pending) < concurrency:
+                        job = next(input_jobs, None)
+                        if job is None:
+                            exhausted = True
+                        else:
+                            pending[asyncio.ensure_future(call(proc, job.ifn, job.ofn))] = job
+                    if not pending:
+                        break
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        success, timing = task.result() if timed else (task.result(), None)
+                        self._job_done(pending.pop(task), success, timing)
+                        nfiles += 1
+                        if success:
+                            nsuccess += 1
+                        elif self.opts.stoponerror:
+                            stop = True
+                    if stop:
+                        break
+            finally:
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.wait(pending)
+                self._end_run()
+        return nfiles, nsuccess
+
+    async def _call_proc_async(self,
+                               proc: Callable[[Optional[str], Optional[str], argparse.Namespace],
+                                              Awaitable[Optional[bool]]],
+                               ifn: Optional[str],
+                               ofn: Optional[str]) -> bool:
+        """ Await the actual processor and intercept anything that goes wrong
+        :param proc: Coroutine function to call
+        :param ifn: Input file name to process.  If absent, typical use is stdin
+        :param ofn: Output file name. If absent, typical use is stdout
+        :return: true means process was successful
+        """
+        rslt = False
+        try:
+            rslt = await proc(ifn, ofn, self.opts)
+        except Exception as e:
+            self._proc_error(ifn, e)
+        return True if rslt or rslt is None else False
+
+    async def _timed_call_proc_async(self,
+                                     proc: Callable[[Optional[str], Optional[str], argparse.Namespace],
+                                                    Awaitable[Optional[bool]]],
+                                     ifn: Optional[str],
+                                     ofn: Optional[str]) -> Tuple[bool, Timing]:
+        """ _call_proc_async, measuring the wall clock time of the coroutine for --stats.  The coroutines share the
+        thread, so their CPU time can't be told apart and isn't measured.
+        :return: Result of proc and its timing
+        """
+        nbytes = _input_size(ifn)
+        start = time.perf_counter()
+        success = await self._call_proc_async(proc, ifn, ofn)
+        return success, Timing(time.perf_counter() - start, None, nbytes)
+
+    def _count_results(self, results: Iterable[Tuple[Job, Any]], stop: threading.Event, timed: bool=False) \
+            -> Tuple[int, int]:
+        """ Tally the proc results, signalling a stop on the first failure if --stoponerror is set
+        :param results: (job, proc result) tuples
+        :param stop: Event to set when processing should stop
+        :param timed: Each proc result is a (result, Timing) tuple from _timed_call
         :return: tuple - (number of files passed to proc: int, number of files that passed proc)
         """
         nfiles = 0
         nsuccess = 0
+        for job, success in results:
+            timing = None
+            if timed:
+                success, timing = success
+            self._job_done(job, success, timing)
+            nfiles += 1
+            if success:
+                nsuccess += 1
+            elif self.opts.stoponerror:
+                stop.set()
+        return nfiles, nsuccess
+
+    def _job_done(self, job: Job, success: bool, timing: Optional[Timing]=None) -> None:
+        """ Record the outcome of a job
+        :param job: Job that was run
+        :param success: proc result
+        :param timing: Measurements of the proc call for --stats
+        """
+        ifn = job.ifn
+        if ifn in self._archive_members:
+            ifn = self._archive_members.pop(job.ifn)
+            self._archive.release(job.ifn)
+        elif ifn in self._fetched:
+            # A cached download is shared by every job for the same URL
+            urls = self._fetched[job.ifn]
+            ifn = urls.pop()
+            if not urls:
+                del self._fetched[job.ifn]
+            self._fetcher.release(job.ifn)
+        ofn = self._stager.finish(job.ofn, success) if self._stager and job.ofn is not None else job.ofn
+        if self._manifest and ifn in self._digests:
+            digest, size = self._digests.pop(ifn)
+            self._manifest.record(ifn, digest, size, ofn, success)
+        if self._journal and ifn is not None:
+            self._journal.record(ifn, success)
+        if self._stats:
+            self._stats.record(ifn, success, timing)
+        if self._progress:
+            self._progress.done += 1
+
+    def _end_run(self) -> None:
+        """ Release anything acquired by _plan or run """
+        if self._progress:
+            self._progress.close()
+            self._progress = None
+        if self._manifest:
+            self._manifest.close()
+            self._manifest = None
+        self._digests = {}
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+        if self._stager:
+            self._stager.close()
+            self._stager = None
+        if self._stats:
+            self._stats.write(self.opts.stats, self.nskipped)
+            self._stats = None
+        if self._profiling:
+            self._profiling.close()
+            self._profiling = None
+        if self._archive:
+            self._archive.close()
+            self._archive = None
+        self._archive_members = {}
+        if self._fetcher:
+            self._fetcher.close()
+            self._fetcher = None
+        self._fetched = {}
+
+    def _njobs(self, jobs: Optional[int], executor: str) -> int:
+        """ Determine the number of workers to use
+        :param jobs: Number of jobs from the run call.  If absent, use the --jobs option
+        :param executor: Type of worker.  Zero jobs means one process per CPU or, for threads, the
+                         ThreadPoolExecutor default
+        :return: Number of workers.  1 means process serially
+        """
+        if jobs is None:
+            jobs = self.opts.jobs
+        if jobs is None:
+            return 1
+        if jobs > 0:
+            return jobs
+        return min(32, (os.cpu_count() or 1) + 4) if executor == 'thread' else (os.cpu_count() or 1)
+
+    def _plan(self,
+              file_filter: Optional[Callable[[str], bool]],
+              file_filter_2: Optional[Callable[[Optional[str], str, argparse.Namespace], bool]],
+              entry_filter: Optional[Callable[[os.DirEntry, argparse.Namespace], bool]],
+              dependencies: Optional[Callable[[str, str, argparse.Namespace], Iterable[str]]]) \
+            -> Iterator[Job]:
+        """ Generate the jobs that actually need to be run, resetting the skip count.  Anything acquired here is
+        released by _end_run.
+        :param file_filter: Additional filter for testing file names, types, etc.
+        :param file_filter_2: File filter that includes directory, filename and opts
+        :param entry_filter: Filter on the os.DirEntry of files in the input directory
+        :param dependencies: Additional files that an output depends on
+        :return: Job generator
+        """
+        self.nskipped = 0
+        if self.opts.stats is not None:
+            self._stats = RunStats()
+        if self.opts.inarchive:
+            self._archive = ArchiveInput(self.opts.inarchive)
+        file_names = self._iter_file_names(file_filter, file_filter_2, entry_filter, self._stats, self._archive)
+        if self._stats:
+            file_names = self._stats.timed_traversal(file_names)
+        input_jobs = (Job(ifn, ofn, index) for index, (ifn, ofn) in enumerate(file_names))
+        if self.opts.shard:
+            input_jobs = (job for job in input_jobs if self.in_shard(job.ifn))
+        if self.opts.journal:
+            # Later --watch rounds add to the journal, and anything they see has changed since it was recorded
+            if self.opts.resume and not self._watch_round:
+                input_jobs = self._unfinished_jobs(input_jobs, Journal.successes(self.opts.journal))
+            self._journal = Journal(self.opts.journal, append=self.opts.resume or self._watch_round > 0)
+        if self.opts.incremental and not self._aggregate_output():
+            input_jobs = self._stale_jobs(input_jobs, dependencies)
+        if self.opts.manifest is not None and not self._aggregate_output():
+            manifest_path = self.opts.manifest or os.path.join(self.opts.outdir, MANIFEST_NAME)
+            if os.path.dirname(manifest_path):
+                os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+            self._manifest = Manifest(manifest_path)
+            input_jobs = self._changed_jobs(input_jobs)
+        if self.opts.schedule == 'largest-first':
+            input_jobs = self._largest_first(input_jobs, self.opts.lookahead)
+        if self.opts.atomic and not self._aggregate_output():
+            self._stager = OutputStager(fsync=self.opts.fsync)
+        elif self.opts.outarchive:
+            self._stager = ArchiveOutput(self.opts.outarchive)
+        if self._stager:
+            stager = self._stager
+            input_jobs = (job._replace(ofn=stager.stage(job.ofn)) if job.ofn is not None else job
+                          for job in input_jobs)
+        if self._archive:
+            input_jobs = self._extracted_jobs(input_jobs)
+        if self.opts.prefetch:
+            self._fetcher = UrlFetcher(self.opts.prefetch, self.opts.fetch_cache)
+            input_jobs = self._fetched_jobs(input_jobs)
+        if self._stats:
+            input_jobs = self._stats.timed_plan(input_jobs)
+        if self.opts.progress and sys.stderr.isatty():
+            candidates = None
+            if self.opts.progress == 'count' and self.opts.infile_list != '-' and self._watch_entries is None:
+                candidates = (ifn for ifn, _ in self._iter_file_names(file_filter, file_filter_2, entry_filter)
+                              if self.in_shard(ifn))
+            self._progress = Progress(sys.stderr, lambda: self.nskipped, candidates)
+            input_jobs = self._progress.track(input_jobs)
+        return input_jobs
+
+    def _extracted_jobs(self, input_jobs: Iterable[Job]) -> Iterator[Job]:
+        """ Unpack each archive member to a scratch file as its job is handed out.  Nothing between the archive and
+        here holds jobs back, so the job's member is always the archive's current one.  The scratch file is removed
+        when the job is done.
+        :param input_jobs: Jobs naming archive members
+        :return: Jobs naming the scratch files
+        """
+        for job in input_jobs:
+            tmp = self._archive.extract()
+            self._archive_members[tmp] = job.ifn
+            yield job._replace(ifn=tmp)
+
+    def _fetched_jobs(self, input_jobs: Iterable[Job]) -> Iterator[Job]:
+        """ Download URL inputs ahead of the jobs that need them, keeping up to twice as many jobs in hand as there are
+        download threads.  Each job is handed out in order once its download is complete, naming the downloaded file.
+        If a download fails, the error is reported and the job keeps its URL.
+        :param input_jobs: Jobs to prefetch
+        :return: Jobs naming the downloaded files
+        """
+        pending = deque()
+        try:
+            for job in input_jobs:
+                fetchable = job.ifn is not None and UrlFetcher.fetchable(job.ifn)
+                pending.append((job, self._fetcher.submit(job.ifn) if fetchable else None))
+                if len(pending) > 2 * self._fetcher.workers:
+                    yield self._fetched_job(*pending.popleft())
+            while pending:
+                yield self._fetched_job(*pending.popleft())
+        finally:
+            for _, future in pending:
+                if future:
+                    future.cancel()
+
+    def _fetched_job(self, job: Job, future: Optional[Future]) -> Job:
+        """ Wait for the download of a job's URL and point the job at the downloaded file
+        :param job: Job to update
+        :param future: Download of job.ifn.  None if the input isn't a URL
+        :return: Updated job
+        """
+        if future is None:
+            return job
+        try:
+            fn = future.result()
+        except Exception as e:
+            self._proc_error(job.ifn, e)
+            return job
+        self._fetched.setdefault(fn, []).append(job.ifn)
+        return job._replace(ifn=fn)
+
+    def in_shard(self, ifn: Optional[str]) -> bool:
+        """ Determine whether ifn belongs to the --shard being processed.  The shard depends only on the path relative
+        to the input directory, so every node sharing a tree agrees on it regardless of the walk order.
+        Stdin always belongs to the first shard.
+        :param ifn: Input file name
+        :return: True if there is no --shard or ifn is in it
+        """
+        if not self.opts.shard:
+            return True
+        k, n = self.opts.shard
+        if ifn is None:
+            return k == 1
+        indir_prefix = self._input_root_prefix()
+        relpath = ifn[len(indir_prefix):] if indir_prefix and ifn.startswith(indir_prefix) else ifn
+        return zlib.crc32(relpath.replace(os.sep, '/').encode('utf-8', 'surrogateescape')) % n == k - 1
+
+    def _unfinished_jobs(self, input_jobs: Iterable[Job], finished: Iterable[str]) -> Iterator[Job]:
+        """ Filter out the jobs that the journal says succeeded, counting them in nskipped
+        :param input_jobs: Jobs to filter
+        :param finished: Input file names to skip
+        :return: Job generator
+        """
+        for job in input_jobs:
+            if job.ifn in finished:
+                self.nskipped += 1
+            else:
+                yield job
+
+    @staticmethod
+    def _largest_first(input_jobs: Iterable[Job], lookahead: int) -> Iterator[Job]:
+        """ Reorder the jobs so that the largest input file of the next lookahead jobs is always started first.
+        Memory use is bounded by lookahead.
+        :param input_jobs: Jobs to reorder
+        :param lookahead: Number of jobs to choose from
+        :return: Job generator
+        """
+        window = []
+        for job in input_jobs:
+            try:
+                size = os.stat(job.ifn).st_size if job.ifn is not None and '://' not in job.ifn else 0
+            except OSError:
+                size = 0
+            heapq.heappush(window, (-size, job.index, job))
+            if len(window) >= lookahead:
+                yield heapq.heappop(window)[2]
+        while window:
+            yield heapq.heappop(window)[2]
+
+    def _aggregate_output(self) -> bool:
+        """ Determine whether the inputs are all being merged into a single output file """
+        return bool(self.opts.outfile) and len(self.opts.outfile) == 1 and \
+            (bool(self.opts.indir or self.opts.infile_list or self.opts.inarchive) or len(self.opts.infile or []) > 1)
+
+    def _input_root_prefix(self) -> str:
+        """ The input directory or archive with a trailing separator - what input file names are relative to.  Empty
+        if there isn't one """
+        root = self.opts.indir or self.opts.inarchive
+        return os.path.join(root, '') if root else ''
+
+    def _stale_jobs(self,
+                    input_jobs: Iterable[Job],
+                    dependencies: Optional[Callable[[str, str, argparse.Namespace], Iterable[str]]]) \
+            -> Iterator[Job]:
+        """ Filter out the jobs whose output is up to date, counting them in nskipped
+        :param input_jobs: Jobs to filter
+        :param dependencies: Additional files that an output depends on
+        :return: Job generator
+        """
+        for job in input_jobs:
+            if self._up_to_date(job.ifn, job.ofn, dependencies):
+                self.nskipped += 1
+            else:
+                yield job
+
+    def _changed_jobs(self, input_jobs: Iterable[Job]) \
+            -> Iterator[Job]:
+        """ Filter out the jobs whose input has the same content and output as the last successful run according to
+        the manifest, counting them in nskipped.  Inputs are hashed by a pool of threads working ahead of the caller.
+        :param input_jobs: Jobs to filter
+        :return: Job generator
+        """
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as hashers:
+            window = deque()
+            for job in input_jobs:
+                window.append((job, hashers.submit(self._file_digest, job.ifn)))
+                if len(window) >= HASH_LOOKAHEAD:
+                    yield from self._unless_unchanged(*window.popleft())
+            while window:
+                yield from self._unless_unchanged(*window.popleft())
+
+    def _unless_unchanged(self, job: Job, hashed: Future) \
+            -> Iterator[Job]:
+        """ Generate job unless the manifest says that it has already been done.  Otherwise, hold on to the digest
+        for _job_done.
+        :param job: Job to test
+        :param hashed: Future (digest, size) of the input file.  None if it can't be hashed
+        :return: job or nothing
+        """
+        digest = hashed.result()
+        if digest is None:
+            yield job
+            return
+        entry = self._manifest.lookup(job.ifn)
+        if entry and entry.success and (entry.digest, entry.size, entry.ofn) == (digest[0], digest[1], job.ofn) and \
+                (job.ofn is None or os.path.exists(job.ofn)):
+            self.nskipped += 1
+        else:
+            self._digests[job.ifn] = digest
+            yield job
+
+    @staticmethod
+    def _file_digest(ifn: Optional[str]) -> Optional[Tuple[str, int]]:
+        """ Return the (digest, size) of ifn or None if it isn't a readable file """
+        if ifn is None or '://' in ifn:
+            return None
+        try:
+            return hash_file(ifn)
+        except OSError:
+            return None
+
+    def _up_to_date(self,
+                    ifn: Optional[str],
+                    ofn: Optional[str],
+                    dependencies: Optional[Callable[[str, str, argparse.Namespace], Iterable[str]]]) -> bool:
+        """ Determine whether ofn exists and is newer than ifn and anything else it depends on
+        :param ifn: Input file name
+        :param ofn: Output file name
+        :param dependencies: Additional files that an output depends on
+        :return: True means the job can be skipped
+        """
+        if ifn is None or ofn is None or '://' in ifn:
+            return False
+        try:
+            out_mtime = os.stat(ofn).st_mtime_ns
+            if os.stat(ifn).st_mtime_ns > out_mtime:
+                return False
+            if dependencies:
+                for dep in dependencies(ifn, ofn, self.opts):
+                    if os.stat(dep).st_mtime_ns > out_mtime:
+                        return False
+        except OSError:
+            return False
+        return True
+
+    def iter_jobs(self,
+                  file_filter: Optional[Callable[[str], bool]]=None,
+                  file_filter_2: Optional[Callable[[Optional[str], str, argparse.Namespace], bool]]=None,
+                  entry_filter: Optional[Callable[[os.DirEntry, argparse.Namespace], bool]]=None) -> Iterator[Job]:
+        """ Generate the jobs that run would hand to proc, without running anything.  Input files are found as they
+        are needed, so an input directory of any size can be planned in constant memory.  --shard is applied, but
+        --resume, --incremental and --manifest are not.
+        :param file_filter: Additional filter for testing file names, types, etc.
+        :param file_filter_2: File filter that includes directory, filename and opts
+        :param entry_filter: Filter on the os.DirEntry of files in the input directory
+        :return: (input file name, output file name, index) Job generator
+        """
+        for index, (ifn, ofn) in enumerate(self._iter_file_names(file_filter, file_filter_2, entry_filter)):
+            if self.in_shard(ifn):
+                yield Job(ifn, ofn, index)
+
+    def _iter_file_names(self,
+                         file_filter: Optional[Callable[[str], bool]],
+                         file_filter_2: Optional[Callable[[Optional[str], str, argparse.Namespace], bool]],
+                         entry_filter: Optional[Callable[[os.DirEntry, argparse.Namespace], bool]],
+                         stats: Optional[RunStats]=None,
+                         archive: Optional[ArchiveInput]=None) \
+            -> Iterator[Tuple[Optional[str], Optional[str]]]:
+        """ Generate the (input file name, output file name) pairs that pass the filters, timing the filters in stats
+        if it is present.  Archive members are read from archive if it is supplied, otherwise the archive is opened
+        just to list them.  Their input file names are the archive path followed by the member path. """
+        matcher = self._matcher(file_filter, file_filter_2)
+        check_filter = self._check_filter
+        if stats:
+            check_filter = stats.timed_filter(check_filter)
+            entry_filter = stats.timed_filter(entry_filter) if entry_filter else None
 
         # List of one or more input and output files
         if self.opts.infile:
             for file_idx in range(len(self.opts.infile)):
                 in_f = self.opts.infile[file_idx]
-                if self._check_filter(in_f, self.opts.indir, file_filter, file_filter_2):
+                if check_filter(in_f, self.opts.indir, file_filter, file_filter_2, matcher):
                     fn = os.path.join(self.opts.indir, in_f) if self.opts.indir else in_f
-                    nfiles += 1
-                    if self._call_proc(proc, fn, self._outfile_name('', fn, outfile_idx=file_idx)):
-                        nsuccess += 1
-                    elif self.opts.stoponerror:
-                        return nfiles, nsuccess
+                    yield fn, self._outfile_name('', fn, outfile_idx=file_idx)
+
+        # Input files named in a list
+        elif self.opts.infile_list:
+            for entry in self._list_entries(self.opts.infile_list):
+                entry = os.path.normpath(entry)
+                fn = os.path.join(self.opts.indir, entry) if self.opts.indir else entry
+                dirpath, name = os.path.split(fn)
+                relpath = entry.replace(os.sep, '/') if matcher.needs_path else ''
+                if check_filter(name, dirpath, file_filter, file_filter_2, matcher, relpath):
+                    yield fn, self._outfile_name(dirpath, name)
+
+        # Members of an input archive
+        elif self.opts.inarchive:
+            own_archive = archive is None
+            archive = ArchiveInput(self.opts.inarchive) if own_archive else archive
+            try:
+                for member in archive.members():
+                    relpath = posixpath.normpath(member.lstrip('/'))
+                    if relpath == os.pardir or relpath.startswith(os.pardir + '/'):
+                        relpath = posixpath.basename(relpath)
+                    # Skip what the walk would prune - hidden and excluded directories
+                    dirs = relpath.split('/')[:-1]
+                    if any(d.startswith('.') for d in dirs) or \
+                            (matcher.has_dir_excludes and
+                             any(matcher.prunes('/'.join(dirs[:n + 1])) for n in range(len(dirs)))):
+                        continue
+                    fn = os.path.join(self.opts.inarchive, *relpath.split('/'))
+                    dirpath, name = os.path.split(fn)
+                    if check_filter(name, dirpath, file_filter, file_filter_2, matcher, relpath):
+                        yield fn, self._outfile_name(dirpath, name)
+            finally:
+                if own_archive:
+                    archive.close()
 
         # Single input from the command line
         elif not self.opts.indir:
-            if self._check_filter(None, None, file_filter, file_filter_2):
-                nfiles += 1
-                if self._call_proc(proc, None, self._outfile_name('', '')):
-                    nsuccess += 1
+            if check_filter(None, None, file_filter, file_filter_2):
+                yield None, self._outfile_name('', '')
 
         # Input directory that needs to be navigated
         else:
-            for dirpath, _, filenames in os.walk(self.opts.indir):
-                for fn in filenames:
-                    if self._check_filter(fn, dirpath, file_filter, file_filter_2):
-                        nfiles += 1
-                        if self._call_proc(proc, os.path.join(dirpath, fn), self._outfile_name(dirpath, fn)):
-                            nsuccess += 1
-                        elif self.opts.stoponerror:
-                            return nfiles, nsuccess
+            # Relative paths are only worked out if an --include or --exclude needs them
+            indir_prefix_len = len(os.path.join(self.opts.indir, ''))
+            if self._watch_entries is not None:
+                entries = ((os.path.dirname(entry.path), entry) for entry in self._watch_entries)
+            else:
+                entries = self._walk(self.opts.indir, matcher.prunes if matcher.has_dir_excludes else None)
+            for dirpath, entry in entries:
+                relpath = entry.path[indir_prefix_len:].replace(os.sep, '/') if matcher.needs_path else ''
+                if check_filter(entry.name, dirpath, file_filter, file_filter_2, matcher, relpath) and \
+                        (not entry_filter or entry_filter(entry, self.opts)):
+                    yield entry.path, self._outfile_name(dirpath, entry.name)
+
+    @contextmanager
+    def _watcher(self) -> Iterator[Watcher]:
+        """ Set up a --watch run, putting everything back when it ends """
+        matcher = self._matcher(None, None)
+        watcher = Watcher(self.opts.indir, matcher.prunes if matcher.has_dir_excludes else None, self.opts.watch,
+                          self.opts.settle)
+        self._watch_round = 0
+        self._watch_stop.clear()
+        self._watch_workers = ExitStack()
+        try:
+            yield watcher
+        finally:
+            self._watch_stop.set()
+            self._watch_entries = None
+            self._watch_round = 0
+            workers = self._watch_workers
+            self._watch_workers = None
+            self._watch_pools = {}
+            try:
+                workers.close()
+            finally:
+                watcher.close()
 
+    def _watch(self, run_round: Callable[[], Tuple[int, int]]) -> Tuple[int, int]:
+        """ Process the input directory in rounds, for --watch.  The first round takes every file in it and each later
+        one the files that have been added or changed since, once they have settled.  Rounds go on until stop_watching
+        is called, the run is interrupted or, with --stoponerror, a round has a failure.
+        :param run_round: Function that runs a round over _watch_entries
+        :return: tuple - totals over all the rounds, as for run
+        """
+        nfiles = 0
+        nsuccess = 0
+        with self._watcher() as watcher:
+            try:
+                while True:
+                    self._watch_entries = watcher.changes(self._watch_stop)
+                    if self._watch_entries is None:
+                        break
+                    round_files, round_success = run_round()
+                    nfiles += round_files
+                    nsuccess += round_success
+                    self._watch_round += 1
+                    if self.opts.stoponerror and round_success < round_files:
+                        break
+            except KeyboardInterrupt:
+                pass
         return nfiles, nsuccess
 
+    async def _watch_async(self, run_round: Callable[[], Awaitable[Tuple[int, int]]]) -> Tuple[int, int]:
+        """ _watch for run_async.  The wait for changes is done on a thread so that the event loop carries on
+        :param run_round: Coroutine function that runs a round over _watch_entries
+        :return: tuple - totals over all the rounds, as for run
+        """
+        nfiles = 0
+        nsuccess = 0
+        loop = asyncio.get_running_loop()
+        with self._watcher() as watcher:
+            while True:
+                self._watch_entries = await loop.run_in_executor(None, watcher.changes, self._watch_stop)
+                if self._watch_entries is None:
+                    break
+                round_files, round_success = await run_round()
+                nfiles += round_files
+                nsuccess += round_success
+                self._watch_round += 1
+                if self.opts.stoponerror and round_success < round_files:
+                    break
+        return nfiles, nsuccess
+
+    def stop_watching(self) -> None:
+        """ End a --watch run once the current round is done.  May be called from any thread """
+        self._watch_stop.set()
+
+    @staticmethod
+    def _list_entries(path: str, block_size: int=1 << 16) -> Iterator[str]:
+        """ Generate the file names in an --infile-list, reading it a block at a time.  Names are NUL separated if
+        there is a NUL in the first LIST_DETECT_BYTES and newline separated otherwise.  Empty names are ignored.
+        :param path: List file.  "-" means stdin
+        :param block_size: Most bytes to read at a time
+        :return: File name generator
+        """
+        f = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            sep = None
+            tail = b''
+            while True:
+                block = f.read1(block_size)
+                if not block:
+                    break
+                tail += block
+                if sep is None:
+                    if b'\0' in tail:
+                        sep = b'\0'
+                    elif len(tail) < LIST_DETECT_BYTES:
+                        continue
+                    else:
+                        sep = b'\n'
+                entries = tail.split(sep)
+                tail = entries.pop()
+                for entry in entries:
+                    entry = entry.rstrip(b'\r') if sep == b'\n' else entry
+                    if entry:
+                        yield os.fsdecode(entry)
+            for entry in tail.split(sep or b'\n'):
+                entry = entry.rstrip(b'\r') if sep != b'\0' else entry
+                if entry:
+                    yield os.fsdecode(entry)
+        finally:
+            if f is not sys.stdin.buffer:
+                f.close()
+
+    @staticmethod
+    def _walk(top: str, prune_dir: Optional[Callable[[str], bool]]=None) -> Iterator[Tuple[str, os.DirEntry]]:
+        """ Walk the directory tree under top, generating the non-directory entries.  Like os.walk, it goes top down,
+        does not follow directory symlinks and ignores directories that can't be read.  Unlike os.walk, directories
+        whose names begin with "." are not descended.
+        :param top: Root of the tree
+        :param prune_dir: Test for directories not to descend.  Called with the path relative to top, "/" separated
+        :return: (directory path, directory entry) generator
+        """
+        top_prefix_len = len(os.path.join(top, ''))
+        dirs = [top]
+        while dirs:
+            dirpath = dirs.pop()
+            subdirs = []
+            try:
+                with os.scandir(dirpath) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if not is_dir:
+                            yield dirpath, entry
+                        elif not entry.name.startswith('.') and not entry.is_symlink() and \
+                                not (prune_dir and prune_dir(entry.path[top_prefix_len:].replace(os.sep, '/'))):
+                            subdirs.append(entry.path)
+            except OSError:
+                continue
+            dirs += reversed(subdirs)
+
+    @staticmethod
+    def _serial_results(items: Iterable[Any],
+                        stop: threading.Event,
+                        call: Callable[[Any], Any]) -> Iterator[Tuple[Any, Any]]:
+        """ Process the work items one at a time in the calling thread
+        :param items: Work items
+        :param stop: Set by the caller when no further work should be started
+        :param call: Function to process an item
+        :return: Generator of (item, result)
+        """
+        for item in items:
+            yield item, call(item)
+            if stop.is_set():
+                return
+
+    @staticmethod
+    def _pooled_results(executor: Executor,
+                        njobs: int,
+                        items: Iterable[Any],
+                        stop: threading.Event,
+                        worker_call: Callable[[Any], Any]) -> Iterator[Tuple[Any, Any]]:
+        """ Process the work items in an executor, keeping a bounded number of them in flight.  Results are returned
+        in completion order.  Once stop is set, work that hasn't started is cancelled and the results of the work
+        that is already running are still returned.
+        :param executor: Pool whose workers have been initialized with _init_worker
+        :param njobs: Number of workers in the pool
+        :param items: Work items
+        :param stop: Set by the caller when no further work should be started
+        :param worker_call: Module level function to process an item
+        :return: Generator of (item, result)
+        """
+        items = iter(items)
+        max_pending = 4 * njobs
+        pending = {}
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and not stop.is_set() and len(pending) < max_pending:
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                    else:
+                        pending[executor.submit(worker_call, item)] = item
+                if not pending:
+                    return
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    if not future.cancelled():
+                        yield item, future.result()
+                if stop.is_set():
+                    pending = {future: item for future, item in pending.items() if not future.cancel()}
+        finally:
+            for future in pending:
+                future.cancel()
+
     def _outfile_name(self, dirpath: str, infile: str, outfile_idx: int=0) -> Optional[str]:
         """ Construct the output file name from the input file.  If a single output file was named and there isn't a
         directory, return the output file.
@@ -207,7 +1635,7 @@ class DirectoryListProcessor:
         :param outfile_idx: Index into output file list (for multiple input/output files)
         :return: Full name of output file or None if output is not otherwise supplied
         """
-        if not self.opts.outfile and not self.opts.outdir:
+        if not self.opts.outfile and not self.opts.outdir and not self.opts.outarchive:
             # Up to the process itself to decide what do do with it
             return None
 
@@ -224,10 +1652,26 @@ class DirectoryListProcessor:
                 outfile_element = os.path.basename(infile).rsplit('.', 1)[0]
 
         else:
-            # Doing an input directory to an output directory
-            relpath = dirpath[len(self.opts.indir) + 1:] if not self.opts.flatten and self.opts.indir else ''
-            outfile_element = os.path.join(relpath, os.path.split(infile)[1][:-len(self.infile_suffix)])
-        return (os.path.join(self.opts.outdir, outfile_element) if self.opts.outdir else outfile_element) + \
+            # Doing an input directory or an --infile-list to an output directory.  The input file's path below the
+            # input directory is kept.  Without an input directory, so is the path of a relative --infile-list name
+            indir_prefix = self._input_root_prefix()
+            if self.opts.flatten:
+                relpath = ''
+            elif indir_prefix and dirpath.startswith(indir_prefix):
+                relpath = dirpath[len(indir_prefix):]
+                # A normalized --infile-list name can only leave the input directory through leading ".." components
+                if relpath == os.pardir or relpath.startswith(os.pardir + os.sep):
+                    relpath = ''
+            elif not indir_prefix and dirpath and not os.path.isabs(dirpath) and \
+                    not os.path.normpath(dirpath).startswith(os.pardir):
+                relpath = os.path.normpath(dirpath)
+            else:
+                relpath = ''
+            fname = os.path.split(infile)[1]
+            suffix_len = max((len(suffix) for suffix in self._infile_suffixes() if fname.endswith(suffix)), default=0)
+            outfile_element = os.path.join(relpath, fname[:len(fname) - suffix_len])
+        outdir = self.opts.outdir or self.opts.outarchive
+        return (os.path.join(outdir, outfile_element) if outdir else outfile_element) + \
                (self.outfile_suffix if not self.opts.outfile and self.outfile_suffix else '')
 
 
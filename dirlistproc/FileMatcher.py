@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import fnmatch
+import re
+from typing import Any, Callable, Optional, Sequence
+
+
+def _glob_re(glob: str) -> str:
+    """ Translate a glob into a regular expression for a relative path.  A glob without a "/" matches the last
+    component of the path, one with a "/" matches the whole path. """
+    return fnmatch.translate(glob) if '/' in glob else r'(?:.*/)?' + fnmatch.translate(glob)
+
+
+def _combine(globs: Sequence[str], regexes: Sequence[str]) -> Optional[Callable[[str], Any]]:
+    """ Compile a list of globs and (unanchored) regular expressions into a test for a relative path.  The globs are
+    joined into a single pattern.  Each regular expression is compiled on its own, since it may carry global inline
+    flags such as (?i) that only work at the start of a pattern.
+    :return: Function that returns a true value if the path matches any of them.  None if there are none
+    """
+    tests = [re.compile('|'.join('(?:{})'.format(_glob_re(glob)) for glob in globs)).match] if globs else []
+    tests += [re.compile(regex).search for regex in regexes]
+    if len(tests) <= 1:
+        return tests[0] if tests else None
+    return lambda relpath: any(test(relpath) for test in tests)
+
+
+class FileMatcher:
+    def __init__(self, suffixes: Sequence[str]=('',),
+                 include: Sequence[str]=(), exclude: Sequence[str]=(),
+                 include_re: Sequence[str]=(), exclude_re: Sequence[str]=(),
+                 exclude_dir: Sequence[str]=(),
+                 skip_hidden: bool=True):
+        """ The built-in file selection rules, compiled once so that each candidate costs a couple of C level calls.
+        Relative paths use "/" as the separator.
+        :param suffixes: A file name must end with one of these
+        :param include: Globs.  If any includes are present, a file must match one of them
+        :param exclude: Globs.  A file that matches any of these is rejected
+        :param include_re: Regular expressions (re.search semantics) that act as includes
+        :param exclude_re: Regular expressions (re.search semantics) that act as excludes
+        :param exclude_dir: Globs for directories that aren't searched
+        :param skip_hidden: Reject names that begin with "."
+        """
+        self.suffixes = tuple(suffixes)
+        self.skip_hidden = skip_hidden
+        self._include = _combine(include, include_re)
+        self._exclude = _combine(exclude, exclude_re)
+        self._exclude_dir = _combine(exclude_dir, ())
+        self.needs_path = self._include is not None or self._exclude is not None
+        self.has_dir_excludes = self._exclude_dir is not None
+
+    def matches(self, name: str, relpath: str) -> bool:
+        """ Determine whether a file is selected
+        :param name: File name
+        :param relpath: Path relative to the input directory.  Only used if there are includes or excludes
+        """
+        return name.endswith(self.suffixes) and not (self.skip_hidden and name.startswith('.')) and \
+            self.selected(relpath)
+
+    def selected(self, relpath: str) -> bool:
+        """ Apply just the includes and excludes """
+        return (self._include is None or bool(self._include(relpath))) and \
+            (self._exclude is None or not self._exclude(relpath))
+
+    def prunes(self, relpath: str) -> bool:
+        """ Determine whether a directory is excluded
+        :param relpath: Directory path relative to the input directory
+        """
+        return self.has_dir_excludes and bool(self._exclude_dir(relpath))
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import json
+import os
+import time
+from typing import Set
+
+
+class Journal:
+    def __init__(self, path: str, append: bool=False, sync_interval: float=5.0):
+        """ An append-only record of the jobs that have finished, one JSON line per job.  Writes are buffered and the
+        file is flushed and fsynced at most every sync_interval seconds, and on close.
+        :param path: Journal file
+        :param append: True means add to an existing journal.  Otherwise any existing journal is replaced
+        :param sync_interval: Seconds between syncs
+        """
+        self.sync_interval = sync_interval
+        self._file = open(path, 'a' if append else 'w', buffering=1 << 16, encoding='utf-8')
+        self._next_sync = time.monotonic() + sync_interval
+
+    @staticmethod
+    def successes(path: str) -> Set[str]:
+        """ Return the input files whose most recent journal entry is a success.  A partial last line, as left by a
+        crash, is ignored.
+        :param path: Journal file.  A missing file has no successes
+        :return: Set of input file names
+        """
+        rval = set()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        ifn, success = json.loads(line)
+                    except ValueError:
+                        continue
+                    if success:
+                        rval.add(ifn)
+                    else:
+                        rval.discard(ifn)
+        return rval
+
+    def record(self, ifn: str, success: bool) -> None:
+        """ Add a job outcome to the journal """
+        self._file.write(json.dumps([ifn, success]) + '\n')
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+
+    def sync(self) -> None:
+        """ Force everything written so far onto the disk """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._next_sync = time.monotonic() + self.sync_interval
+
+    def close(self) -> None:
+        self.sync()
+        self._file.close()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import hashlib
+import sqlite3
+from typing import Optional, Tuple, NamedTuple, List
+
+MANIFEST_NAME = ".dlp_manifest.sqlite"
+
+
+class ManifestEntry(NamedTuple):
+    digest: str
+    size: int
+    ofn: Optional[str]
+    success: bool
+
+
+def hash_file(fn: str, chunk_size: int=1 << 20) -> Tuple[str, int]:
+    """ Compute the content hash of a file
+    :param fn: File name
+    :param chunk_size: Read size.  hashlib releases the GIL for large buffers, so several files can be hashed in
+                       parallel threads
+    :return: tuple - (hex digest, file size)
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    size = 0
+    with open(fn, 'rb') as f:
+        chunk = f.read(chunk_size)
+        while chunk:
+            digest.update(chunk)
+            size += len(chunk)
+            chunk = f.read(chunk_size)
+    return digest.hexdigest(), size
+
+
+class Manifest:
+    def __init__(self, path: str, batch_size: int=1000):
+        """ A persistent record of what happened to each input file on previous runs, keyed by input file name
+        :param path: SQLite file to use.  Created if it doesn't exist
+        :param batch_size: Number of updates to group into each transaction
+        """
+        self.batch_size = batch_size
+        self._updates = []          # type: List[Tuple[str, str, int, Optional[str], int]]
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS manifest (ifn TEXT PRIMARY KEY, digest TEXT NOT NULL, "
+                           "size INTEGER NOT NULL, ofn TEXT, success INTEGER NOT NULL)")
+        self._conn.commit()
+
+    def lookup(self, ifn: str) -> Optional[ManifestEntry]:
+        """ Return the most recent record for ifn or None if there isn't one """
+        row = self._conn.execute("SELECT digest, size, ofn, success FROM manifest WHERE ifn = ?", (ifn,)).fetchone()
+        return ManifestEntry(row[0], row[1], row[2], bool(row[3])) if row else None
+
+    def record(self, ifn: str, digest: str, size: int, ofn: Optional[str], success: bool) -> None:
+        """ Record the result of processing ifn.  Updates are written in batches. """
+        self._updates.append((ifn, digest, size, ofn, int(success)))
+        if len(self._updates) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Write any outstanding updates in a single transaction """
+        if self._updates:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO manifest (ifn, digest, size, ofn, success) "
+                                       "VALUES (?, ?, ?, ?, ?)", self._updates)
+            self._updates = []
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
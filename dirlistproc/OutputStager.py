@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import uuid
+from typing import Dict, Set
+
+TEMP_PREFIX = ".dlp-"
+
+
+class OutputStager:
+    def __init__(self, fsync: bool=False, sync_batch: int=64):
+        """ Give each output file a temporary name in its target directory and move it into place once it has been
+        written successfully, so an interrupted or failed proc never leaves a partial output under the real name.
+        Target directories are created as they are needed and remembered, so each is only created once.
+        :param fsync: Flush each output to disk before it is renamed, and the directories holding the new names
+                      every sync_batch renames and on close
+        :param sync_batch: Number of renames between directory syncs
+        """
+        self.fsync = fsync
+        self.sync_batch = sync_batch
+        self._dirs = set()              # type: Set[str]
+        self._staged = {}               # type: Dict[str, str]
+        self._unsynced_dirs = set()     # type: Set[str]
+        self._nunsynced = 0
+
+    def stage(self, ofn: str) -> str:
+        """ Return the temporary name to write ofn under, creating its directory if necessary.  The temporary name
+        keeps the file name (and suffix) of ofn behind a "." prefix, so a directory walk passes over it.
+        :param ofn: Output file name
+        :return: Temporary output file name
+        """
+        dirname, basename = os.path.split(ofn)
+        if dirname not in self._dirs:
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            self._dirs.add(dirname)
+        tmp = os.path.join(dirname, TEMP_PREFIX + uuid.uuid4().hex[:12] + '-' + basename)
+        self._staged[tmp] = ofn
+        return tmp
+
+    def finish(self, tmp: str, success: bool) -> str:
+        """ Move a staged output into place if its proc succeeded, otherwise discard it.  A proc that succeeds without
+        writing anything leaves any earlier output in place.
+        :param tmp: Temporary name returned by stage
+        :param success: proc result
+        :return: Final output file name
+        """
+        ofn = self._staged.pop(tmp)
+        if not os.path.exists(tmp):
+            return ofn
+        if not success:
+            os.remove(tmp)
+            return ofn
+        if self.fsync:
+            fd = os.open(tmp, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        os.replace(tmp, ofn)
+        if self.fsync:
+            self._unsynced_dirs.add(os.path.dirname(ofn))
+            self._nunsynced += 1
+            if self._nunsynced >= self.sync_batch:
+                self.sync()
+        return ofn
+
+    def sync(self) -> None:
+        """ Make the renames done so far durable by syncing the directories that hold them """
+        for dirname in self._unsynced_dirs:
+            try:
+                fd = os.open(dirname or os.curdir, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.fsync(fd)
+            except OSError:
+                pass                    # Some platforms and file systems can't sync a directory
+            finally:
+                os.close(fd)
+        self._unsynced_dirs.clear()
+        self._nunsynced = 0
+
+    def close(self) -> None:
+        """ Discard the outputs of any jobs that never finished and sync the rest """
+        for tmp in self._staged:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._staged.clear()
+        self.sync()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import cProfile
+import glob
+import multiprocessing.util
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+from typing import Any, Callable, List, Optional
+
+# Profile of the current worker thread and the run that it belongs to
+_local = threading.local()
+
+
+class Profiling:
+    def __init__(self, path: str, sample: int=1, ntop: int=20):
+        """ cProfile the proc calls of a run, merging the profiles of every worker into a single pstats file.
+        Serial and thread workers hand their profiles back directly.  Process workers dump theirs to a scratch
+        directory when they exit.
+        :param path: pstats output file
+        :param sample: Only profile every sample'th job
+        :param ntop: Number of functions to list when the run is done
+        """
+        self.path = path
+        self.sample = sample
+        self.ntop = ntop
+        self.run_id = uuid.uuid4().hex
+        self.parts_dir = tempfile.mkdtemp(prefix='dlp_profile_')
+        self._profiles = []             # type: Optional[List[cProfile.Profile]]
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        """ A copy in a process worker only needs the settings """
+        state = self.__dict__.copy()
+        state['_profiles'] = None
+        state.pop('_lock')
+        return state
+
+    def _profile(self) -> cProfile.Profile:
+        """ Return the profile for the current worker thread, creating it on first use """
+        if getattr(_local, 'run_id', None) != self.run_id:
+            _local.profile = cProfile.Profile()
+            _local.run_id = self.run_id
+            if self._profiles is None:
+                multiprocessing.util.Finalize(None, _local.profile.dump_stats,
+                                              args=(os.path.join(self.parts_dir, str(os.getpid())), ), exitpriority=5)
+            else:
+                with self._lock:
+                    self._profiles.append(_local.profile)
+        return _local.profile
+
+    def call(self, call: Callable[[Any], Any], job: Any) -> Any:
+        """ Invoke call on a job, profiling it if the job is in the sample.  A batch of jobs is profiled if any of
+        them is in the sample.
+        :param call: Function that runs the job
+        :param job: Job or list of jobs to run
+        :return: Result of call
+        """
+        if all(j.index % self.sample for j in (job if isinstance(job, list) else [job])):
+            return call(job)
+        profile = self._profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active - newer Pythons only allow one at a time across all threads
+            return call(job)
+        try:
+            return call(job)
+        finally:
+            profile.disable()
+
+    def close(self) -> None:
+        """ Merge the worker profiles into path and print the functions with the most time of their own """
+        try:
+            parts = [profile for profile in self._profiles if profile.getstats()] + \
+                sorted(glob.glob(os.path.join(self.parts_dir, '*')))
+            if not parts:
+                print("--profile: no files were profiled", file=sys.stderr)
+                return
+            stats = pstats.Stats(parts[0], stream=sys.stderr)
+            if len(parts) > 1:
+                stats.add(*parts[1:])
+            stats.dump_stats(self.path)
+            stats.sort_stats('tottime').print_stats(self.ntop)
+        finally:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import datetime
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
+
+
+class Progress:
+    def __init__(self, stream: TextIO, skipped: Callable[[], int], candidates: Optional[Iterable[Any]]=None,
+                 interval: float=1.0):
+        """ A one line progress display - files done out of the total, rate and estimated time remaining.  The line is
+        redrawn by a background thread every interval seconds, so all the run itself does is bump a counter.
+        :param stream: Display stream.  Should be a terminal
+        :param skipped: Function returning the number of files skipped so far.  They count as done
+        :param candidates: If present, a separate walk of the input files that is counted in the background to get
+                           the total early.  Otherwise the total is known when the jobs run out
+        :param interval: Seconds between redraws
+        """
+        self.stream = stream
+        self.interval = interval
+        self.done = 0                   # Jobs finished - maintained by the run
+        self.found = 0                  # Jobs handed out so far
+        self.total = None               # type: Optional[int]
+        self._skipped = skipped
+        self._closed = threading.Event()
+        self._start = self._last_time = time.monotonic()
+        self._last_done = 0
+        self._rate = None               # type: Optional[float]
+        self._width = 0
+        self._threads = [threading.Thread(target=self._display, daemon=True)]
+        if candidates is not None:
+            self._threads.append(threading.Thread(target=self._count, args=(candidates, ), daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def track(self, jobs: Iterable[Any]) -> Iterator[Any]:
+        """ Pass the jobs through, counting them.  The total is known when they run out """
+        for job in jobs:
+            self.found += 1
+            yield job
+        if self.total is None:
+            self.total = self.found + self._skipped()
+
+    def _count(self, candidates: Iterable[Any]) -> None:
+        ncandidates = 0
+        for _ in candidates:
+            if self._closed.is_set():
+                return
+            ncandidates += 1
+        if self.total is None:
+            self.total = ncandidates
+
+    def _display(self) -> None:
+        while not self._closed.wait(self.interval):
+            self._draw()
+
+    def _draw(self) -> None:
+        now = time.monotonic()
+        done = self.done
+        if now > self._last_time:
+            rate = (done - self._last_done) / (now - self._last_time)
+            self._rate = rate if self._rate is None else 0.3 * rate + 0.7 * self._rate
+            self._last_time, self._last_done = now, done
+        ndone = done + self._skipped()
+        total = self.total
+        rate = self._rate or 0.0
+        if total is None:
+            line = "{:,}/{:,}+ files  {:,.1f} files/s".format(ndone, self.found + self._skipped(), rate)
+        else:
+            eta = datetime.timedelta(seconds=int((total - ndone) / rate)) if rate and total > ndone else None
+            line = "{:,}/{:,} files ({:.1f}%)  {:,.1f} files/s  ETA {}" \
+                .format(ndone, total, 100.0 * ndone / total if total else 100.0, rate, eta if eta is not None else '-')
+        self.stream.write('\r' + line.ljust(self._width))
+        self.stream.flush()
+        self._width = len(line)
+
+    def close(self) -> None:
+        """ Stop the display, leaving the final figures on their own line """
+        self._closed.set()
+        # The counting thread notices on its next candidate.  Waiting for that could mean waiting for a long walk
+        self._threads[0].join()
+        # The final line shows the average rate over the whole run
+        self._last_time, self._last_done, self._rate = self._start, 0, None
+        self._draw()
+        self.stream.write('\n')
+        self.stream.flush()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import heapq
+import json
+import sys
+import time
+from typing import Optional, List, Tuple, Callable, Iterable, Iterator, Any, NamedTuple
+
+SUB_BUCKET_BITS = 4             # 16 buckets per power of two - values are recorded to within 1/16 (about 6%)
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class Timing(NamedTuple):
+    wall: float                 # Seconds from the start to the end of the proc call
+    cpu: Optional[float]        # CPU seconds used by the calling thread during the call.  None if not measured
+    nbytes: int                 # Size of the input file
+
+
+class Histogram:
+    def __init__(self):
+        """ A fixed size histogram of non-negative integers with log-linear buckets, in the style of HdrHistogram.
+        Each power of two is split into 2**SUB_BUCKET_BITS buckets, so recording costs the same regardless of how
+        many values there are and percentiles are accurate to a few percent. """
+        self.counts = [0] * (64 << SUB_BUCKET_BITS)
+        self.total = 0
+        self.sum = 0
+        self.min = None             # type: Optional[int]
+        self.max = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        """ Bucket holding value.  Values below 2**SUB_BUCKET_BITS get a bucket each """
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        if shift < 0:
+            return value
+        return ((shift + 1) << SUB_BUCKET_BITS) + (value >> shift) - (1 << SUB_BUCKET_BITS)
+
+    @staticmethod
+    def _highest(index: int) -> int:
+        """ Largest value that falls in bucket index """
+        shift = (index >> SUB_BUCKET_BITS) - 1
+        if shift < 0:
+            return index
+        return ((((index & ((1 << SUB_BUCKET_BITS) - 1)) + (1 << SUB_BUCKET_BITS) + 1) << shift) - 1)
+
+    def record(self, value: int) -> None:
+        self.counts[self._index(min(value, (1 << 63) - 1))] += 1
+        self.total += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> int:
+        """ Return a value that at least pct percent of the recorded values are less than or equal to """
+        if not self.total:
+            return 0
+        target = max(1, -(-self.total * pct // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._highest(index), self.max)
+        return self.max
+
+
+class RunStats:
+    def __init__(self, nslowest: int=10):
+        """ Statistics for a run - time spent finding and filtering input files, and the time, CPU time, input size and
+        outcome of each proc call.  Per-file figures go into histograms and a bounded heap, so the memory used doesn't
+        grow with the number of files.
+        :param nslowest: Number of slowest files to report
+        """
+        self.nslowest = nslowest
+        self.start = time.perf_counter()
+        self.plan_time = 0.0            # Waiting for the next job - finding, filtering and every other planning stage
+        self.traversal_time = 0.0       # Finding and filtering the input files
+        self.filter_time = 0.0
+        self.nfiles = 0
+        self.nsuccess = 0
+        self.ntimed = 0
+        self.nbytes = 0
+        self.wall = Histogram()         # Nanoseconds
+        self.cpu = Histogram()          # Nanoseconds
+        self._slowest = []              # type: List[Tuple[float, int, str, Timing, bool]]
+
+    def timed_filter(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """ Wrap a filter so the time spent in it is added to filter_time """
+        def timed(*args: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.filter_time += time.perf_counter() - start
+        return timed
+
+    def timed_plan(self, items: Iterable[Any]) -> Iterator[Any]:
+        """ Pass the finished jobs through, adding the time spent producing them to plan_time """
+        return self._timed(items, 'plan_time')
+
+    def timed_traversal(self, items: Iterable[Any]) -> Iterator[Any]:
+        """ Pass the input file names through, adding the time spent finding and filtering them to traversal_time """
+        return self._timed(items, 'traversal_time')
+
+    def _timed(self, items: Iterable[Any], total: str) -> Iterator[Any]:
+        """ Pass items through, adding the time spent producing them to the total attribute """
+        it = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                setattr(self, total, getattr(self, total) + time.perf_counter() - start)
+            yield item
+
+    def record(self, ifn: Optional[str], success: bool, timing: Optional[Timing]=None) -> None:
+        """ Record the outcome of a job
+        :param ifn: Input file name
+        :param success: proc result
+        :param timing: Time and size of the proc call, if it was measured
+        """
+        self.nfiles += 1
+        if success:
+            self.nsuccess += 1
+        if timing is not None:
+            self.ntimed += 1
+            self.nbytes += timing.nbytes
+            self.wall.record(int(timing.wall * 1e9))
+            if timing.cpu is not None:
+                self.cpu.record(int(timing.cpu * 1e9))
+            entry = (timing.wall, self.nfiles, ifn if ifn is not None else '-', timing, success)
+            if len(self._slowest) < self.nslowest:
+                heapq.heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    @staticmethod
+    def _seconds(histogram: Histogram) -> Optional[dict]:
+        """ Summarize a histogram of nanoseconds in seconds.  None if nothing was recorded """
+        if not histogram.total:
+            return None
+        rval = dict(total=histogram.sum / 1e9,
+                    mean=histogram.sum / histogram.total / 1e9,
+                    min=histogram.min / 1e9,
+                    max=histogram.max / 1e9)
+        for pct in PERCENTILES:
+            rval['p{}'.format(pct).replace('.', '')] = histogram.percentile(pct) / 1e9
+        return rval
+
+    def summary(self, nskipped: int=0) -> dict:
+        """ Return the statistics as a JSON compatible dictionary.  The input size and the per-file times are None
+        (null) if none of the proc calls were measured.
+        :param nskipped: Number of input files skipped
+        """
+        elapsed = time.perf_counter() - self.start
+        return dict(files=self.nfiles,
+                    successes=self.nsuccess,
+                    failures=self.nfiles - self.nsuccess,
+                    skipped=nskipped,
+                    elapsed_seconds=elapsed,
+                    traversal_seconds=max(self.traversal_time - self.filter_time, 0.0),
+                    filter_seconds=self.filter_time,
+                    planning_seconds=self.plan_time,
+                    timed_files=self.ntimed,
+                    input_bytes=self.nbytes if self.ntimed else None,
+                    files_per_second=self.nfiles / elapsed if elapsed else 0.0,
+                    bytes_per_second=(self.nbytes / elapsed if elapsed else 0.0) if self.ntimed else None,
+                    wall_seconds=self._seconds(self.wall),
+                    cpu_seconds=self._seconds(self.cpu),
+                    slowest=[dict(file=ifn, wall_seconds=timing.wall, cpu_seconds=timing.cpu, bytes=timing.nbytes,
+                                  success=success)
+                             for _, _, ifn, timing, success in sorted(self._slowest, reverse=True)])
+
+    def write(self, path: Optional[str], nskipped: int=0) -> None:
+        """ Write the summary as JSON
+        :param path: File to write.  Empty or None means stderr
+        :param nskipped: Number of input files skipped
+        """
+        text = json.dumps(self.summary(nskipped), indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(text + '\n')
+        else:
+            print(text, file=sys.stderr)
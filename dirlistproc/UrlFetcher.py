@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import hashlib
+import http.client
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+
+FETCH_SCHEMES = ('http', 'https')
+MAX_REDIRECTS = 5
+
+
+class UrlFetcher:
+    def __init__(self, workers: int, cache_dir: Optional[str]=None, timeout: float=60.0):
+        """ Download http and https URLs to local files on a pool of threads.  Connections are kept alive and reused,
+        and no more than workers are ever open to one host.  Downloads go to cache_dir if it is given, where they are
+        kept and reused by later runs, and to a scratch directory that is removed on close otherwise.
+        :param workers: Most downloads in progress at once
+        :param cache_dir: Directory to keep downloads in
+        :param timeout: Socket timeout in seconds
+        """
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._dir = cache_dir or tempfile.mkdtemp(prefix='dlp_fetch_')
+        self._idle = {}                 # type: Dict[Tuple[str, str], List[http.client.HTTPConnection]]
+        self._lock = threading.Lock()
+        self._futures = set()           # type: Set[Future]
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dlp-fetch')
+
+    @staticmethod
+    def fetchable(url: str) -> bool:
+        """ Determine whether url is one that fetch can download """
+        return urlsplit(url).scheme.lower() in FETCH_SCHEMES
+
+    def local_name(self, url: str) -> str:
+        """ The file that url is downloaded to.  It ends with the last part of the URL path, so suffix checks still
+        work on it.  In the cache directory the name comes from the URL, so later runs find it.  In the scratch
+        directory every download gets a name of its own, so a URL that is given twice isn't removed from under one
+        job when the other is done with it. """
+        basename = posixpath.basename(urlsplit(url).path) or 'index'
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16] if self.cache_dir else uuid.uuid4().hex[:16]
+        return os.path.join(self._dir, key + '-' + basename)
+
+    def submit(self, url: str) -> "Future[str]":
+        """ Start downloading url
+        :param url: URL to download
+        :return: Future for the name of the downloaded file
+        """
+        future = self._pool.submit(self.fetch, url)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    def fetch(self, url: str) -> str:
+        """ Download url, unless it is already in the cache directory.  The download is written under a temporary
+        name and renamed when it is complete, so an interrupted download is never mistaken for a cached one.
+        :param url: URL to download
+        :return: Name of the downloaded file
+        """
+        fn = self.local_name(url)
+        if self.cache_dir and os.path.exists(fn):
+            return fn
+        tmp = os.path.join(self._dir, '.dlp-' + uuid.uuid4().hex[:12])
+        location = url
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                location = self._get(location, tmp)
+                if location is None:
+                    os.replace(tmp, fn)
+                    return fn
+            raise IOError("Too many redirects: {}".format(url))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _get(self, url: str, tmp: str) -> Optional[str]:
+        """ GET url into tmp over a pooled connection
+        :return: The location to follow if the response is a redirect, otherwise None
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme.lower(), parts.netloc)
+        path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+        conn, reused = self._connection(key)
+        try:
+            try:
+                conn.request('GET', path)
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionError):
+                if not reused:
+                    raise
+                # The server closed the idle connection - try once more on a new one
+                conn.close()
+                conn, _ = self._connection(key, new=True)
+                conn.request('GET', path)
+                resp = conn.getresponse()
+            if resp.status in (301, 302, 303, 307, 308) and resp.getheader('Location'):
+                resp.read()
+                location = urljoin(url, resp.getheader('Location'))
+            elif resp.status != 200:
+                resp.read()
+                raise IOError("HTTP {} {}: {}".format(resp.status, resp.reason, url))
+            else:
+                with open(tmp, 'wb') as f:
+                    shutil.copyfileobj(resp, f, 1 << 20)
+                location = None
+        except Exception:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                self._idle.setdefault(key, []).append(conn)
+        return location
+
+    def _connection(self, key: Tuple[str, str], new: bool=False) -> Tuple[http.client.HTTPConnection, bool]:
+        """ Take an idle connection to a host from the pool, or open a new one
+        :param key: (scheme, host) to connect to
+        :param new: Always open a new connection
+        :return: The connection and whether it has been used before
+        """
+        if not new:
+            with self._lock:
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop(), True
+        scheme, netloc = key
+        conn_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return conn_class(netloc, timeout=self.timeout), False
+
+    def release(self, fn: str) -> None:
+        """ Remove a downloaded file once it has been processed, unless it is being kept in the cache directory """
+        if not self.cache_dir:
+            try:
+                os.remove(fn)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """ Cancel the downloads that haven't started, wait for the rest, close the pooled connections and remove the
+        scratch directory """
+        for future in list(self._futures):
+            future.cancel()
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+        if not self.cache_dir:
+            shutil.rmtree(self._dir, ignore_errors=True)
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+_EVENT = struct.Struct('iIII')
+
+Signature = Tuple[int, int]             # (mtime in ns, size)
+
+
+class WatchedEntry:
+    """ Stand-in for the os.DirEntry of a file that the watcher reports, built from the stat that it already has so
+    that nothing has to list the file's directory again """
+    __slots__ = ('name', 'path', '_stat')
+
+    def __init__(self, path: str, st: os.stat_result):
+        self.name = os.path.basename(path)
+        self.path = path
+        self._stat = st
+
+    def stat(self, *, follow_symlinks: bool=True) -> os.stat_result:
+        return self._stat if follow_symlinks else os.lstat(self.path)
+
+    def is_file(self, *, follow_symlinks: bool=True) -> bool:
+        return stat.S_ISREG(self.stat(follow_symlinks=follow_symlinks).st_mode)
+
+    def is_dir(self, *, follow_symlinks: bool=True) -> bool:
+        return stat.S_ISDIR(self.stat(follow_symlinks=follow_symlinks).st_mode)
+
+    def is_symlink(self) -> bool:
+        return os.path.islink(self.path)
+
+    def inode(self) -> int:
+        return os.lstat(self.path).st_ino
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    def __repr__(self) -> str:
+        return '<WatchedEntry {!r}>'.format(self.name)
+
+
+def _inotify() -> Optional[ctypes.CDLL]:
+    """ The C library if it has inotify, otherwise None """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+    return libc if all(hasattr(libc, name) for name in ('inotify_init1', 'inotify_add_watch', 'inotify_rm_watch')) \
+        else None
+
+
+class Watcher:
+    def __init__(self, top: str, prune_dir: Optional[Callable[[str], bool]]=None, interval: float=2.0,
+                 settle: float=2.0, use_inotify: bool=True):
+        """ Keep an index of the (mtime, size) of the files in a directory tree and report the ones that are new or
+        have changed since they were last reported.  Changes are picked up with inotify where it is available and by
+        rescanning the tree every interval seconds otherwise.  A file is only reported once it has been left alone for
+        settle seconds, so files that are still being written aren't picked up early.
+        :param top: Root of the tree.  Directories are descended as by DirectoryListProcessor._walk
+        :param prune_dir: Test for directories not to descend.  Called with the path relative to top, "/" separated
+        :param interval: Seconds between rescans without inotify, and the longest a call to changes waits before
+                         checking for a stop
+        :param settle: Seconds a file must be unchanged before it is reported
+        :param use_inotify: Use inotify if it is available
+        """
+        self.top = top
+        self.prune_dir = prune_dir
+        self.interval = interval
+        self.settle = settle
+        self._top_prefix_len = len(os.path.join(top, ''))
+        self._index = {}                # type: Dict[str, Signature]
+        self._pending = {}              # type: Dict[str, Tuple[Signature, float]]
+        self._scanned = False
+        self._libc = _inotify() if use_inotify else None
+        self._fd = None                 # type: Optional[int]
+        self._watches = {}              # type: Dict[int, str]
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                self._libc = None
+            else:
+                self._fd = fd
+
+    @property
+    def inotify(self) -> bool:
+        """ Whether changes are picked up with inotify rather than by rescanning """
+        return self._fd is not None
+
+    def changes(self, stop: threading.Event) -> Optional[List[WatchedEntry]]:
+        """ Wait for files that are new or have changed since the last call and have since settled.  The first call
+        reports every file in the tree, once it has settled.
+        :param stop: Event that ends the wait
+        :return: Entries for the files, sorted by path, or None if stop was set first
+        """
+        while not stop.is_set():
+            if not self._scanned:
+                self._observe(self._scan(self.top))
+                self._scanned = True
+            elif self.inotify:
+                self._observe(self._events(min(self.interval, self.settle / 2) if self._pending else self.interval))
+            else:
+                if stop.wait(min(self.interval, self.settle / 2) if self._pending else self.interval):
+                    break
+                self._rescan()
+            settled = self._settled()
+            if settled:
+                return settled
+        return None
+
+    def _observe(self, paths: Iterable[str]) -> None:
+        """ Note the current state of paths, queueing the ones that differ from the index """
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                self._forget(path)
+                continue
+            sig = (st.st_mtime_ns, st.st_size)
+            if self._index.get(path) == sig:
+                self._pending.pop(path, None)
+            elif path not in self._pending or self._pending[path][0] != sig:
+                self._pending[path] = (sig, time.monotonic())
+
+    def _settled(self) -> List[WatchedEntry]:
+        """ Move the queued files that have been left alone for settle seconds into the index
+        :return: Their entries, sorted by path
+        """
+        settled = []
+        now, wall_now = time.monotonic(), time.time()
+        for path, (sig, seen) in list(self._pending.items()):
+            if wall_now - sig[0] / 1e9 < self.settle and now - seen < self.settle:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                self._forget(path)
+                continue
+            if (st.st_mtime_ns, st.st_size) != sig:
+                self._pending[path] = ((st.st_mtime_ns, st.st_size), now)
+                continue
+            del self._pending[path]
+            self._index[path] = sig
+            settled.append(WatchedEntry(path, st))
+        return sorted(settled, key=lambda entry: entry.path)
+
+    def _forget(self, path: str) -> None:
+        """ Drop a file that has gone, so it is reported again if it comes back """
+        self._index.pop(path, None)
+        self._pending.pop(path, None)
+
+    def _forget_tree(self, dirpath: str) -> None:
+        """ Drop every file below a directory that has gone """
+        prefix = os.path.join(dirpath, '')
+        for path in [path for path in self._index if path.startswith(prefix)]:
+            del self._index[path]
+        for path in [path for path in self._pending if path.startswith(prefix)]:
+            del self._pending[path]
+
+    def _scan(self, top: str) -> Iterable[str]:
+        """ Generate the files in the tree below top, watching each directory if inotify is in use """
+        dirs = [top]
+        while dirs:
+            dirpath = dirs.pop()
+            if self.inotify:
+                self._add_watch(dirpath)
+            try:
+                with os.scandir(dirpath) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if not is_dir:
+                            yield entry.path
+                        elif self._descend(entry.name, entry.path, entry.is_symlink()):
+                            dirs.append(entry.path)
+            except OSError:
+                continue
+
+    def _descend(self, name: str, path: str, is_symlink: bool) -> bool:
+        """ Determine whether a directory is part of the tree, using the same rules as the directory walk """
+        return not name.startswith('.') and not is_symlink and \
+            not (self.prune_dir and self.prune_dir(path[self._top_prefix_len:].replace(os.sep, '/')))
+
+    def _rescan(self) -> None:
+        """ Rescan the whole tree, noting new and changed files and dropping the ones that have gone """
+        seen = set()                    # type: Set[str]
+        for path in self._scan(self.top):
+            seen.add(path)
+            self._observe([path])
+        for path in [path for path in self._index if path not in seen]:
+            self._forget(path)
+        for path in [path for path in self._pending if path not in seen]:
+            self._forget(path)
+
+    def _add_watch(self, dirpath: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = dirpath
+
+    def _events(self, timeout: float) -> List[str]:
+        """ Wait up to timeout seconds for inotify events and work out which files they affect.  New directories are
+        scanned, since files can land in them before they are watched.
+        :return: Names of the files that may have changed
+        """
+        paths = []
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return paths
+        while True:
+            try:
+                data = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_len = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + name_len].rstrip(b'\0')
+                offset += _EVENT.size + name_len
+                if mask & IN_Q_OVERFLOW:
+                    self._rescan()
+                    continue
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                dirpath = self._watches.get(wd)
+                if dirpath is None or not name:
+                    continue
+                name = os.fsdecode(name)
+                path = os.path.join(dirpath, name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        if self._descend(name, path, os.path.islink(path)):
+                            paths.extend(self._scan(path))
+                    elif mask & (IN_DELETE | IN_MOVED_FROM):
+                        self._forget_tree(path)
+                        for old_wd in [w for w, p in self._watches.items()
+                                       if p == path or p.startswith(os.path.join(path, ''))]:
+                            self._libc.inotify_rm_watch(self._fd, old_wd)
+                            self._watches.pop(old_wd, None)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._forget(path)
+                else:
+                    paths.append(path)
+        return paths
+
+    def close(self) -> None:
+        """ Stop watching """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._watches.clear()
@@ -30,4 +30,4 @@
 
 """ Directory based input and output processor. """
 
-from dirlistproc.DirectoryListProcessor import DirectoryListProcessor
+from dirlistproc.DirectoryListProcessor import DirectoryListProcessor, Job
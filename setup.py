@@ -29,19 +29,14 @@ try:
     from setuptools import setup
 except ImportError:
     from distutils.core import setup
-import sys
-
-if sys.version_info < (3, 5):
-    install_requires = ["typing"]
-else:
-    install_requires = []
 
 setup(
     name='dirlistproc',
     version='1.4.5',
     packages=['dirlistproc'],
     url='http://github.com/hsolbrig/dirlistproc',
-    install_requires=install_requires,
+    python_requires='>=3.7',
+    extras_require={'zstd': ['zstandard']},
     license='BSD',
     author='Harold Solbrig',
     author_email='solbrig.harold@mayo.edu',
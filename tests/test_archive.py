@@ -0,0 +1,139 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from dirlistproc import DirectoryListProcessor
+
+MEMBERS = [('f1.xml', b'one'), ('f1.txt', b'text'), ('d1/f3.xml', b'three'), ('.d/f5.xml', b'hidden'),
+           ('d1/d2/f4.xml', b'four')]
+
+
+def read_input(ifn, ofn, _):
+    """ Process function for the pool tests - it has to be picklable """
+    with open(ifn, 'rb') as f:
+        return f.read() != b'' and os.path.basename(ofn) in ('f1.foo', 'f3.foo', 'f4.foo')
+
+
+class ArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.tgz = os.path.join(self.tmpdir.name, 'in.tar.gz')
+        with tarfile.open(self.tgz, 'w:gz') as tar:
+            dir_info = tarfile.TarInfo('d1')
+            dir_info.type = tarfile.DIRTYPE
+            tar.addfile(dir_info)
+            for name, data in MEMBERS:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = 1000000000
+                tar.addfile(info, io.BytesIO(data))
+        self.zip = os.path.join(self.tmpdir.name, 'in.zip')
+        with zipfile.ZipFile(self.zip, 'w') as zf:
+            for name, data in MEMBERS:
+                zf.writestr(name, data)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def jobs(self, args):
+        dlp = DirectoryListProcessor(args.split(), "Test", '.xml', '.foo')
+        return [(ifn, ofn) for ifn, ofn, _ in dlp.iter_jobs()]
+
+    def test_listing(self):
+        for archive in (self.tgz, self.zip):
+            self.assertEqual([(os.path.join(archive, 'f1.xml'), 'out/f1.foo'),
+                              (os.path.join(archive, 'd1', 'f3.xml'), 'out/d1/f3.foo'),
+                              (os.path.join(archive, 'd1', 'd2', 'f4.xml'), 'out/d1/d2/f4.foo')],
+                             self.jobs('--inarchive {} -od out'.format(archive)))
+
+    def test_filters(self):
+        self.assertEqual([(os.path.join(self.tgz, 'd1', 'f3.xml'), 'out/f3.foo')],
+                         self.jobs('--inarchive {} -od out -f --exclude-dir d2 --include d1/*'.format(self.tgz)))
+
+    def test_run(self):
+        for archive in (self.tgz, self.zip):
+            seen = {}
+
+            def proc(ifn, ofn, _):
+                with open(ifn, 'rb') as f:
+                    seen[os.path.basename(ofn)] = (f.read(), os.path.basename(ifn), os.path.getmtime(ifn))
+                return True
+
+            dlp = DirectoryListProcessor('--inarchive {} -od out'.format(archive).split(), "Test", '.xml', '.foo')
+            self.assertEqual((3, 3), dlp.run(proc))
+            self.assertEqual({'f1.foo', 'f3.foo', 'f4.foo'}, set(seen))
+            self.assertEqual(b'three', seen['f3.foo'][0])
+            self.assertTrue(seen['f3.foo'][1].endswith('f3.xml'))
+            if archive == self.tgz:
+                self.assertEqual(1000000000, seen['f4.foo'][2])
+
+    def test_scratch_removed(self):
+        scratch = []
+
+        def proc(ifn, ofn, _):
+            scratch.append(ifn)
+            return True
+
+        dlp = DirectoryListProcessor('--inarchive {} -od out'.format(self.tgz).split(), "Test", '.xml', '.foo')
+        dlp.run(proc)
+        self.assertEqual(3, len(scratch))
+        self.assertFalse(any(os.path.exists(fn) for fn in scratch))
+        self.assertFalse(os.path.exists(os.path.dirname(scratch[0])))
+
+    def test_parallel(self):
+        for executor in ('thread', 'process'):
+            dlp = DirectoryListProcessor('--inarchive {} -od out -j 2 --executor {}'.format(self.tgz, executor)
+                                         .split(), "Test", '.xml', '.foo')
+            self.assertEqual((3, 3), dlp.run(read_input))
+
+    def test_journal(self):
+        journal = os.path.join(self.tmpdir.name, 'run.journal')
+        dlp = DirectoryListProcessor('--inarchive {} -od out --journal {}'.format(self.tgz, journal).split(),
+                                     "Test", '.xml', '.foo')
+        dlp.run(lambda ifn, ofn, _: ofn.endswith('f1.foo'))
+        dlp = DirectoryListProcessor('--inarchive {} -od out --journal {} --resume'.format(self.tgz, journal).split(),
+                                     "Test", '.xml', '.foo')
+        done = []
+        dlp.run(lambda ifn, ofn, _: done.append(ofn) or True)
+        self.assertEqual(['out/d1/f3.foo', 'out/d1/d2/f4.foo'], done)
+
+    def test_validation(self):
+        for args in ('--inarchive {}/missing.zip', '--inarchive {{}} -i f1.xml', '--inarchive {{}} -id testfiles',
+                     '--inarchive {{}} --incremental', '--inarchive {{}} --schedule largest-first'):
+            dlp = DirectoryListProcessor(args.format(self.tmpdir.name).format(self.zip).split(), "Test", '.xml',
+                                         '.foo', noexit=True)
+            self.assertFalse(dlp.successful_parse, args)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import asyncio
+import os
+import unittest
+from contextlib import redirect_stderr
+
+from dirlistproc import DirectoryListProcessor
+
+
+class RunAsyncTestCase(unittest.TestCase):
+    def test_run_async(self):
+        expected_names = {'testfiles/f1.xml': 'testout/f1.foo',
+                          'testfiles/f2.xml': 'testout/f2.foo',
+                          'testfiles/d1/f3.xml': 'testout/d1/f3.foo',
+                          'testfiles/d1/d2/f4.xml': 'testout/d1/d2/f4.foo',
+                          }
+        active = [0, 0]             # current, maximum
+
+        async def tproc(ifn, ofn, _):
+            active[0] += 1
+            active[1] = max(active)
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+            return expected_names[ifn] == ofn
+
+        dlp = DirectoryListProcessor("-id testfiles -od testout".split(), "Test", '.xml', ".foo")
+        self.assertEqual((4, 4), asyncio.run(dlp.run_async(tproc, concurrency=2)))
+        self.assertEqual(2, active[1])
+        self.assertEqual((3, 3), asyncio.run(dlp.run_async(tproc, lambda fn: 'f4' not in fn)))
+
+    def test_infile_and_stdin(self):
+        async def tproc(ifn, ofn, _):
+            return ifn in (None, 'inp.txt') and ofn == 'out.txt'
+
+        dlp = DirectoryListProcessor("-i inp.txt -o out.txt".split(), "Test", '', '')
+        self.assertEqual((1, 1), asyncio.run(dlp.run_async(tproc)))
+        dlp = DirectoryListProcessor("-o out.txt".split(), "Test", '', '')
+        self.assertEqual((1, 1), asyncio.run(dlp.run_async(tproc)))
+
+    def test_stop_on_error(self):
+        cancelled = []
+
+        async def tproc(ifn, _, __):
+            if 'f1' in ifn:
+                return False
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(ifn)
+                raise
+            return True
+
+        dlp = DirectoryListProcessor("-i testfiles/f2.xml testfiles/f1.xml -s".split(), "Test", '.xml', ".foo")
+        self.assertEqual((1, 0), asyncio.run(dlp.run_async(tproc)))
+        self.assertEqual(['testfiles/f2.xml'], cancelled)
+
+    def test_exception(self):
+        async def tproc(_, __, ___):
+            raise ValueError("Bad file")
+
+        dlp = DirectoryListProcessor("-i inp.txt".split(), "Test", '', '')
+        with open(os.devnull, 'w') as devnull, redirect_stderr(devnull):
+            self.assertEqual((1, 0), asyncio.run(dlp.run_async(tproc)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import tempfile
+import unittest
+
+from dirlistproc import DirectoryListProcessor
+
+
+def write_proc(ifn, ofn, _):
+    with open(ofn, 'w') as f:
+        f.write(ifn)
+    return not ifn.endswith('f2.xml')
+
+
+class AtomicOutputTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.outdir = os.path.join(self.tmpdir.name, 'out')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def outputs(self):
+        return sorted(os.path.relpath(os.path.join(dirpath, fn), self.outdir)
+                      for dirpath, _, fns in os.walk(self.outdir) for fn in fns)
+
+    def test_atomic(self):
+        seen = []
+
+        def proc(ifn, ofn, opts):
+            seen.append(ofn)
+            # The directory has been created and nothing is under the real name yet
+            self.assertTrue(os.path.isdir(os.path.dirname(ofn)))
+            self.assertTrue(os.path.basename(ofn).startswith('.'))
+            self.assertTrue(ofn.endswith('.foo'))
+            self.assertEqual([], [fn for fn in os.listdir(os.path.dirname(ofn)) if not fn.startswith('.')
+                                  and not os.path.isdir(os.path.join(os.path.dirname(ofn), fn))])
+            if ifn.endswith('f4.xml'):
+                with open(ofn, 'w') as f:
+                    f.write('partial')
+                raise ValueError("Crashed half way through")
+            return write_proc(ifn, ofn, opts)
+
+        dlp = DirectoryListProcessor(['-id', 'testfiles', '-od', self.outdir, '--atomic'], "Test", '.xml', '.foo')
+        self.assertEqual((4, 2), dlp.run(proc))
+        self.assertEqual(4, len(seen))
+        self.assertEqual(['d1/f3.foo', 'f1.foo'], self.outputs())
+        with open(os.path.join(self.outdir, 'd1', 'f3.foo')) as f:
+            self.assertEqual('testfiles/d1/f3.xml', f.read())
+
+    def test_failure_keeps_old_output(self):
+        os.makedirs(self.outdir)
+        with open(os.path.join(self.outdir, 'f2.foo'), 'w') as f:
+            f.write('previous')
+        dlp = DirectoryListProcessor(['-id', 'testfiles', '-od', self.outdir, '--atomic', '--fsync'], "Test",
+                                     '.xml', '.foo')
+        self.assertEqual((4, 3), dlp.run(write_proc))
+        self.assertEqual(['d1/d2/f4.foo', 'd1/f3.foo', 'f1.foo', 'f2.foo'], self.outputs())
+        with open(os.path.join(self.outdir, 'f2.foo')) as f:
+            self.assertEqual('previous', f.read())
+
+    def test_parallel(self):
+        dlp = DirectoryListProcessor(['-id', 'testfiles', '-od', self.outdir, '--atomic'], "Test", '.xml', '.foo')
+        self.assertEqual((4, 3), dlp.run(write_proc, jobs=2))
+        self.assertEqual(['d1/d2/f4.foo', 'd1/f3.foo', 'f1.foo'], self.outputs())
+
+    def test_stop_on_error(self):
+        dlp = DirectoryListProcessor(['-id', 'testfiles', '-od', self.outdir, '--atomic', '-s'], "Test",
+                                     '.xml', '.foo')
+        self.assertEqual((2, 1), dlp.run(write_proc))
+        self.assertEqual(['f1.foo'], self.outputs())
+
+    def test_fsync_requires_atomic(self):
+        dlp = DirectoryListProcessor(['-id', 'testfiles', '--fsync'], "Test", '.xml', '.foo', noexit=True)
+        self.assertFalse(dlp.successful_parse)
+
+
+if __name__ == '__main__':
+    unittest.main()
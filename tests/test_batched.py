@@ -0,0 +1,97 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import io
+import unittest
+from contextlib import redirect_stderr
+
+from dirlistproc import DirectoryListProcessor
+
+
+def upper_batch(pairs, _):
+    return [ifn.endswith('.xml') and ofn.endswith('.foo') for ifn, ofn in pairs]
+
+
+class BatchedTestCase(unittest.TestCase):
+    def test_batches(self):
+        batches = []
+
+        def batch_proc(pairs, opts):
+            self.assertTrue(opts.flatten)
+            batches.append(pairs)
+            return [ValueError("Bad f2") if 'f2' in ifn else 'f3' not in ifn for ifn, _ in pairs]
+
+        dlp = DirectoryListProcessor("-id testfiles -od testout -f".split(), "Test", '.xml', ".foo")
+        errors = io.StringIO()
+        with redirect_stderr(errors):
+            self.assertEqual((4, 2), dlp.run_batched(batch_proc, batch_size=3))
+        self.assertEqual([3, 1], [len(batch) for batch in batches])
+        self.assertEqual({('testfiles/f1.xml', 'testout/f1.foo'), ('testfiles/f2.xml', 'testout/f2.foo'),
+                          ('testfiles/d1/f3.xml', 'testout/f3.foo'), ('testfiles/d1/d2/f4.xml', 'testout/f4.foo')},
+                         set(batches[0] + batches[1]))
+        self.assertIn("***** ERROR: testfiles/f2.xml\nBad f2", errors.getvalue())
+        self.assertNotIn("f3.xml", errors.getvalue())
+
+    def test_no_return_and_filters(self):
+        dlp = DirectoryListProcessor("-id testfiles".split(), "Test", '.xml', ".foo")
+        self.assertEqual((3, 3), dlp.run_batched(lambda pairs, _: None, 2, lambda fn: 'f4' not in fn))
+
+    def test_batch_failure(self):
+        def bad_batch(pairs, _):
+            if any('f1' in ifn for ifn, _ in pairs):
+                raise IOError("Database went away")
+            return [True] * (len(pairs) - 1)
+
+        dlp = DirectoryListProcessor("-i testfiles/f1.xml testfiles/f2.xml testfiles/d1/f3.xml".split(), "Test",
+                                     '.xml', ".foo")
+        errors = io.StringIO()
+        with redirect_stderr(errors):
+            self.assertEqual((3, 0), dlp.run_batched(bad_batch, 2))
+        self.assertEqual(3, errors.getvalue().count("***** ERROR"))
+        self.assertIn("Batch processor returned 0 results for 1 files", errors.getvalue())
+
+    def test_stop_on_error(self):
+        calls = []
+
+        def batch_proc(pairs, _):
+            calls.append(pairs)
+            return [False] * len(pairs)
+
+        dlp = DirectoryListProcessor("-id testfiles -s".split(), "Test", '.xml', ".foo")
+        self.assertEqual((2, 0), dlp.run_batched(batch_proc, 2))
+        self.assertEqual(1, len(calls))
+
+    def test_parallel(self):
+        dlp = DirectoryListProcessor("-id testfiles -od testout".split(), "Test", '.xml', ".foo")
+        self.assertEqual((4, 4), dlp.run_batched(upper_batch, 1, jobs=2))
+        self.assertEqual((4, 4), dlp.run_batched(upper_batch, 3, jobs=2, executor='thread'))
+        with self.assertRaises(ValueError):
+            dlp.run_batched(upper_batch, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks import bench_dlp
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_make_tree(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            total = bench_dlp.make_tree(tmpdir, 100, depth=2, fanout=3, suffixes={'.xml': 1, '.txt': 1},
+                                        sizes='fixed', mean_size=10)
+            self.assertEqual(1000, total)
+            files = [os.path.join(dirpath, fn) for dirpath, _, fns in os.walk(tmpdir) for fn in fns]
+            self.assertEqual(100, len(files))
+            self.assertEqual({'.xml', '.txt'}, {os.path.splitext(fn)[1] for fn in files})
+            self.assertEqual(13, sum(1 for _ in os.walk(tmpdir)))
+
+    def test_run(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.path.join(tmpdir, 'bench.json')
+            bench_dlp.main(['--files', '50', '--repeat', '1', '--cases', 'walk,check_filter,run-serial',
+                            '--tree', os.path.join(tmpdir, 'tree'), '-o', output])
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(['walk', 'check_filter', 'run-serial'], [rslt['name'] for rslt in report['results']])
+        self.assertTrue(all(rslt['files'] == 50 for rslt in report['results']))
+
+    def test_child_dies(self):
+        """ A case whose process exits without a result is reported rather than waited on forever """
+        with mock.patch.dict(bench_dlp.CASES, die=lambda *_: os._exit(3)), \
+                mock.patch.object(bench_dlp.multiprocessing, 'get_context',
+                                  return_value=multiprocessing.get_context('fork')):
+            with self.assertRaisesRegex(RuntimeError, 'die exited with code 3'):
+                bench_dlp.measure('die', '.', '.xml', 1, 1, poll=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import unittest
+
+from dirlistproc import DirectoryListProcessor
+from dirlistproc.DirectoryListProcessor import OPTION_DEFAULTS
+
+
+def noop_proc(_, __, ___):
+    return True
+
+
+class FromConfigTestCase(unittest.TestCase):
+    def test_defaults(self):
+        """ OPTION_DEFAULTS has to track the parser """
+        self.assertEqual(OPTION_DEFAULTS, vars(DirectoryListProcessor([], "Test", '.xml', '.foo').opts))
+        dlp = DirectoryListProcessor.from_config()
+        self.assertEqual(OPTION_DEFAULTS, vars(dlp.opts))
+        self.assertIsNone(dlp.parser)
+
+    def test_same_jobs(self):
+        args = "-id testfiles -od testout -f --exclude-dir d2"
+        expected = list(DirectoryListProcessor(args.split(), "Test", '.xml', '.foo').iter_jobs())
+        dlp = DirectoryListProcessor.from_config('.xml', '.foo', indir='testfiles', outdir='testout', flatten=True,
+                                                 exclude_dir='d2')
+        self.assertEqual(['d2'], dlp.opts.exclude_dir)
+        self.assertEqual(expected, list(dlp.iter_jobs()))
+        self.assertEqual(3, len(expected))
+
+    def test_run(self):
+        dlp = DirectoryListProcessor.from_config('.xml', indir='testfiles', shard='1/1')
+        self.assertEqual((1, 1), dlp.opts.shard)
+        self.assertEqual((4, 4), dlp.run(noop_proc))
+        self.assertEqual((4, 4), dlp.run(noop_proc, jobs=2))
+
+    def test_postparse(self):
+        def postparse(opts):
+            opts.bag = "HERE"
+
+        self.assertEqual("HERE", DirectoryListProcessor.from_config(postparse=postparse).opts.bag)
+
+    def test_validation(self):
+        for options in (dict(indir='no_such_dir'),
+                        dict(jobs=-1),
+                        dict(resume=True),
+                        dict(lookahead=0),
+                        dict(fsync=True),
+                        dict(include_re='('),
+                        dict(shard='3/2'),
+                        dict(shard=(3, 2)),
+                        dict(shard=(1, 2, 3)),
+                        dict(jobs='many'),
+                        dict(jobs=2.5),
+                        dict(lookahead=True),
+                        dict(settle='soon'),
+                        dict(executor='fiber')):
+            with self.assertRaises(ValueError, msg=str(options)):
+                DirectoryListProcessor.from_config('.xml', **options)
+        with self.assertRaises(TypeError):
+            DirectoryListProcessor.from_config('.xml', out_dir='testout')
+        with self.assertRaises(TypeError):
+            DirectoryListProcessor.from_config('.xml', extra_options=dict(outdir='testout'))
+
+    def test_coercion(self):
+        dlp = DirectoryListProcessor.from_config('.xml', jobs='4', lookahead=10.0, settle='0.5', shard=[1, 2])
+        self.assertEqual((4, 10, 0.5, (1, 2)), (dlp.opts.jobs, dlp.opts.lookahead, dlp.opts.settle, dlp.opts.shard))
+
+    def test_extra_options(self):
+        """ Options that a processor adds with addargs are passed through extra_options """
+        dlp = DirectoryListProcessor.from_config('.xml', '.txt', extra_options=dict(noconvert=True), indir='testfiles')
+        self.assertEqual((4, 0), dlp.run(lambda ifn, ofn, opts: not opts.noconvert))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -28,6 +28,8 @@
 # OF THE POSSIBILITY OF SUCH DAMAGE.
 import argparse
 import io
+import os
+import tempfile
 import unittest
 import sys
 
@@ -35,8 +37,21 @@ import dirlistproc
 
 
 help_output = """usage: _jb_unittest_runner.py [-h] [-i [INFILE [INFILE ...]]] [-id INDIR]
-                              [-o [OUTFILE [OUTFILE ...]]] [-od OUTDIR] [-f]
-                              [-s]
+                              [--inarchive PATH] [--infile-list PATH]
+                              [--prefetch [N]] [--fetch-cache DIR]
+                              [-o [OUTFILE [OUTFILE ...]]] [-od OUTDIR]
+                              [--outarchive PATH] [-f] [-s] [-j JOBS]
+                              [--executor {process,thread}] [--incremental]
+                              [--manifest [PATH]] [--journal PATH] [--resume]
+                              [--shard K/N] [--schedule {walk,largest-first}]
+                              [--lookahead LOOKAHEAD] [--atomic] [--fsync]
+                              [--stats [PATH]] [--profile PATH]
+                              [--profile-sample K]
+                              [--progress [{estimate,count}]]
+                              [--watch [SECONDS]] [--settle SECONDS]
+                              [--include GLOB] [--exclude GLOB]
+                              [--include-re REGEX] [--exclude-re REGEX]
+                              [--exclude-dir GLOB]
 
 optional arguments:
   -h, --help            show this help message and exit
@@ -44,12 +59,78 @@ optional arguments:
                         Input file(s)
   -id INDIR, --indir INDIR
                         Input directory
+  --inarchive PATH      Process the files in this tar (optionally compressed)
+                        or zip archive without unpacking it
+  --infile-list PATH    Read the input files from this file ("-" for stdin),
+                        one per line or NUL separated as written by find
+                        -print0. Relative names are relative to the input
+                        directory if there is one
+  --prefetch [N]        Download http and https input URLs on N threads
+                        (default: 4) ahead of the processors, reusing
+                        connections to each host. proc is given the downloaded
+                        file
+  --fetch-cache DIR     With --prefetch, keep the downloads in this directory
+                        and reuse them on later runs
   -o [OUTFILE [OUTFILE ...]], --outfile [OUTFILE [OUTFILE ...]]
                         Output file(s)
   -od OUTDIR, --outdir OUTDIR
                         Output directory
+  --outarchive PATH     Write the output files into this archive instead of an
+                        output directory. The format comes from the suffix:
+                        .zip, .tar, .tar.gz, .tgz, .tar.bz2, .tar.xz or
+                        .tar.zst
   -f, --flatten         Flatten output directory
   -s, --stoponerror     Stop on processing error
+  -j JOBS, --jobs JOBS  Number of parallel workers (0 means pick based on CPU
+                        count)
+  --executor {process,thread}
+                        Type of parallel worker (default: process)
+  --incremental         Skip input files whose output is newer than the input
+  --manifest [PATH]     Skip input files whose content hasn't changed since
+                        they were last processed successfully. Default file:
+                        OUTDIR/.dlp_manifest.sqlite
+  --journal PATH        Record each finished input file in this file
+  --resume              Skip the input files recorded as successful in the
+                        journal
+  --shard K/N           Only process shard K of N. Input files are assigned to
+                        shards by their path relative to the input directory
+  --schedule {walk,largest-first}
+                        Order in which input files are started (default: walk)
+  --lookahead LOOKAHEAD
+                        Number of input files that largest-first chooses from
+                        (default: 1000)
+  --atomic              Write each output file under a temporary name and only
+                        move it into place if proc succeeds. Output
+                        directories are created as needed
+  --fsync               With --atomic, flush each output file to disk before
+                        it is moved into place
+  --stats [PATH]        Write timing and throughput statistics for the run as
+                        JSON to this file (default: stderr)
+  --profile PATH        Profile the processor calls, merging the profiles of
+                        every worker into this pstats file
+  --profile-sample K    With --profile, only profile every K'th input file
+                        (default: 1)
+  --progress [{estimate,count}]
+                        Show progress on stderr if it is a terminal. "count"
+                        counts the input files in the background to get the
+                        total early. Otherwise the total is known once every
+                        input file has been found
+  --watch [SECONDS]     After the first pass, keep processing the files that
+                        are added to or change in the input directory until
+                        interrupted. Changes are picked up with inotify if it
+                        is available, otherwise by rescanning every SECONDS
+                        (default: 2)
+  --settle SECONDS      With --watch, only process a file once it has been
+                        left alone for this long (default: 2.0)
+  --include GLOB        Only process input files matching this glob. A glob
+                        with a "/" matches the path relative to the input
+                        directory, otherwise the file name
+  --exclude GLOB        Skip input files matching this glob
+  --include-re REGEX    Only process input files whose relative path contains
+                        a match for this regular expression
+  --exclude-re REGEX    Skip input files whose relative path contains a match
+                        for this regular expression
+  --exclude-dir GLOB    Don't search directories matching this glob
 """
 
 
@@ -301,6 +382,75 @@ class MyTestCase(unittest.TestCase):
         self.assertTrue(dlp.opts.stoponerror)
         self.assertTrue(["testfiles/d1/f3.xml", "testfiles/d1/d2/f4.xml"], dlp.opts.infile)
 
+    def test_hidden_directories(self):
+        with tempfile.TemporaryDirectory() as indir:
+            for path in ('a.xml', '.b.xml', 'd1/c.xml', '.git/objects/d.xml', 'd1/.snapshot/e.xml'):
+                os.makedirs(os.path.join(indir, os.path.dirname(path)), exist_ok=True)
+                with open(os.path.join(indir, path), 'w') as f:
+                    f.write(path)
+            seen = set()
+
+            def tproc(ifn, _, __):
+                seen.add(os.path.relpath(ifn, indir))
+
+            dlp = dirlistproc.DirectoryListProcessor(["-id", indir], "Test", '.xml', ".foo")
+            self.assertEqual((2, 2), dlp.run(tproc))
+            self.assertEqual({'a.xml', os.path.join('d1', 'c.xml')}, seen)
+
+            # Hidden directories are pruned even when a filter would accept hidden files
+            seen.clear()
+            self.assertEqual((3, 3), dlp.run(tproc, lambda _: True))
+            self.assertEqual({'a.xml', '.b.xml', os.path.join('d1', 'c.xml')}, seen)
+
+    def test_walk_order(self):
+        expected = [os.path.join(dirpath, fn) for dirpath, _, filenames in os.walk('testfiles') for fn in filenames]
+        self.assertEqual(expected, [entry.path for _, entry in
+                                    dirlistproc.DirectoryListProcessor._walk('testfiles')])
+
+    def test_entry_filter(self):
+        entries = []
+
+        def entry_filter(entry: os.DirEntry, opts: argparse.Namespace):
+            self.assertIsInstance(opts, argparse.Namespace)
+            entries.append(entry.name)
+            return entry.stat().st_size == 0 and entry.name != 'f2.xml'
+
+        dlp = dirlistproc.DirectoryListProcessor("-id testfiles -od testout".split(), "Test", '.xml', ".foo")
+        self.assertEqual((3, 3), dlp.run(lambda *_: True, entry_filter=entry_filter))
+        # Only the entries that pass the suffix filter get this far
+        self.assertEqual(['f1.xml', 'f2.xml', 'f3.xml', 'f4.xml'], sorted(entries))
+
+    def test_iter_jobs(self):
+        dlp = dirlistproc.DirectoryListProcessor("-id testfiles -od testout".split(), "Test", '.xml', ".foo")
+        jobs = dlp.iter_jobs(lambda fn: 'f2' not in fn)
+        self.assertIs(jobs, iter(jobs))
+        job = next(jobs)
+        self.assertIsInstance(job, dirlistproc.Job)
+        self.assertEqual(0, job.index)
+        self.assertEqual({('testfiles/f1.xml', 'testout/f1.foo'),
+                          ('testfiles/d1/f3.xml', 'testout/d1/f3.foo'),
+                          ('testfiles/d1/d2/f4.xml', 'testout/d1/d2/f4.foo')},
+                         {(ifn, ofn) for ifn, ofn, _ in [job] + list(jobs)})
+
+        dlp = dirlistproc.DirectoryListProcessor("-i a.xml b.txt c.xml -od testout".split(), "Test", '.xml', ".foo")
+        self.assertEqual([('a.xml', 'testout/a.foo', 0), ('c.xml', 'testout/c.foo', 1)], list(dlp.iter_jobs()))
+        dlp = dirlistproc.DirectoryListProcessor([], "Test", '.xml', ".foo")
+        self.assertEqual([(None, None, 0)], list(dlp.iter_jobs()))
+
+    def test_iter_jobs_shard(self):
+        shards = []
+        for k in (1, 2):
+            args = "-id testfiles -od testout --shard {}/2".format(k).split()
+            jobs = list(dirlistproc.DirectoryListProcessor(args, "Test", '.xml', ".foo").iter_jobs())
+            processed = []
+            dirlistproc.DirectoryListProcessor(args, "Test", '.xml', ".foo").run(
+                lambda ifn, ofn, _: processed.append(ifn) or True)
+            self.assertEqual(processed, [ifn for ifn, _, _ in jobs])
+            shards.append(jobs)
+        self.assertEqual(sorted(dirlistproc.DirectoryListProcessor("-id testfiles -od testout".split(), "Test", '.xml',
+                                                                   ".foo").iter_jobs()),
+                         sorted(shards[0] + shards[1]))
+
     def test_help(self):
         save_stdout = sys.stdout
         output = io.StringIO()
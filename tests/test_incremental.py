@@ -0,0 +1,121 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import tempfile
+import unittest
+
+from dirlistproc import DirectoryListProcessor
+
+
+def copy_proc(ifn, ofn, _):
+    os.makedirs(os.path.dirname(ofn), exist_ok=True)
+    with open(ifn) as inf, open(ofn, 'w') as outf:
+        outf.write(inf.read())
+
+
+def set_mtime(fn: str, mtime: int) -> None:
+    os.utime(fn, (mtime, mtime))
+
+
+class IncrementalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.indir = os.path.join(self.tmpdir.name, 'in')
+        self.outdir = os.path.join(self.tmpdir.name, 'out')
+        for path in ('a.xml', 'b.xml', os.path.join('d1', 'c.xml')):
+            os.makedirs(os.path.join(self.indir, os.path.dirname(path)), exist_ok=True)
+            with open(os.path.join(self.indir, path), 'w') as f:
+                f.write(path)
+            set_mtime(os.path.join(self.indir, path), 1000000)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def dlp(self, *extra: str) -> DirectoryListProcessor:
+        return DirectoryListProcessor(["-id", self.indir, "-od", self.outdir, "--incremental"] + list(extra),
+                                      "Test", ".xml", ".txt")
+
+    def test_incremental(self):
+        dlp = self.dlp()
+        self.assertEqual((3, 3), dlp.run(copy_proc))
+        self.assertEqual(0, dlp.nskipped)
+
+        # Nothing has changed
+        self.assertEqual((0, 0), dlp.run(copy_proc))
+        self.assertEqual(3, dlp.nskipped)
+
+        # A newer input and a missing output
+        set_mtime(os.path.join(self.indir, 'a.xml'), 2 ** 40)
+        os.remove(os.path.join(self.outdir, 'd1', 'c.txt'))
+        processed = []
+        self.assertEqual((2, 2), dlp.run(lambda ifn, ofn, _: processed.append(os.path.basename(ifn))))
+        self.assertEqual(['a.xml', 'c.xml'], sorted(processed))
+        self.assertEqual(1, dlp.nskipped)
+
+        # Without the flag, everything is processed
+        dlp = DirectoryListProcessor(["-id", self.indir, "-od", self.outdir], "Test", ".xml", ".txt")
+        self.assertEqual((3, 3), dlp.run(copy_proc))
+        self.assertEqual(0, dlp.nskipped)
+
+    def test_dependencies(self):
+        dep = os.path.join(self.tmpdir.name, 'stylesheet.xsl')
+        with open(dep, 'w') as f:
+            f.write('xsl')
+        set_mtime(dep, 1000000)
+        dlp = self.dlp()
+        self.assertEqual((3, 3), dlp.run(copy_proc))
+
+        def deps(ifn, ofn, _):
+            return [dep] if ifn.endswith('b.xml') else []
+
+        self.assertEqual((0, 0), dlp.run(copy_proc, dependencies=deps))
+        set_mtime(dep, 2 ** 40)
+        self.assertEqual((1, 1), dlp.run(copy_proc, dependencies=deps))
+        self.assertEqual(2, dlp.nskipped)
+
+    def test_not_applicable(self):
+        # Aggregate outputs, stdin and URLs are never skipped
+        outfile = os.path.join(self.tmpdir.name, 'all.txt')
+        with open(outfile, 'w') as f:
+            f.write('all')
+        dlp = DirectoryListProcessor(["-id", self.indir, "-o", outfile, "--incremental"], "Test", ".xml", ".txt")
+        self.assertEqual((3, 3), dlp.run(lambda *_: True))
+        dlp = DirectoryListProcessor(["-o", outfile, "--incremental"], "Test", ".xml", ".txt")
+        self.assertEqual((1, 1), dlp.run(lambda *_: True))
+        dlp = DirectoryListProcessor(["-i", "http://ex.org/a", "-o", outfile, "--incremental"], "Test", "", "")
+        self.assertEqual((1, 1), dlp.run(lambda *_: True))
+
+    def test_parallel(self):
+        dlp = self.dlp("-j", "2")
+        self.assertEqual((3, 3), dlp.run(copy_proc))
+        self.assertEqual((0, 0), dlp.run(copy_proc))
+        self.assertEqual(3, dlp.nskipped)
+
+
+if __name__ == '__main__':
+    unittest.main()
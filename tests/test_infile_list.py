@@ -0,0 +1,116 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from dirlistproc import DirectoryListProcessor
+
+
+class InfileListTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.list_file = os.path.join(self.tmpdir.name, 'files.lst')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_list(self, data: bytes) -> None:
+        with open(self.list_file, 'wb') as f:
+            f.write(data)
+
+    def jobs(self, args):
+        dlp = DirectoryListProcessor(args.split(), "Test", '.xml', '.foo')
+        return [(ifn, ofn) for ifn, ofn, _ in dlp.iter_jobs()]
+
+    def test_newlines(self):
+        self.write_list(b'testfiles/f1.xml\ntestfiles/f1.txt\r\n\ntestfiles/d1/d2/f4.xml')
+        self.assertEqual([('testfiles/f1.xml', 'out/testfiles/f1.foo'),
+                          ('testfiles/d1/d2/f4.xml', 'out/testfiles/d1/d2/f4.foo')],
+                         self.jobs('--infile-list {} -od out'.format(self.list_file)))
+
+    def test_nul(self):
+        self.write_list(b'./f1.xml\0./d1/f3.xml\0./.hidden.xml\0')
+        self.assertEqual([('testfiles/f1.xml', 'out/f1.foo'),
+                          ('testfiles/d1/f3.xml', 'out/d1/f3.foo')],
+                         self.jobs('--infile-list {} -id testfiles -od out'.format(self.list_file)))
+        self.assertEqual([('testfiles/f1.xml', 'out/f1.foo'),
+                          ('testfiles/d1/f3.xml', 'out/f3.foo')],
+                         self.jobs('--infile-list {} -id testfiles -od out -f'.format(self.list_file)))
+
+    def test_outside(self):
+        """ Names that aren't below the output directory's counterpart are flattened """
+        self.write_list(b'/tmp/x/a.xml\n../b.xml\n')
+        self.assertEqual([('/tmp/x/a.xml', 'out/a.foo'), ('../b.xml', 'out/b.foo')],
+                         self.jobs('--infile-list {} -od out'.format(self.list_file)))
+        self.write_list(b'../x/b.xml\nd1/../../c.xml\nd1/f3.xml\n')
+        self.assertEqual([(os.path.join('testfiles', '..', 'x', 'b.xml'), 'out/b.foo'),
+                          (os.path.join('testfiles', '..', 'c.xml'), 'out/c.foo'),
+                          ('testfiles/d1/f3.xml', 'out/d1/f3.foo')],
+                         self.jobs('--infile-list {} -id testfiles -od out'.format(self.list_file)))
+
+    def test_block_boundaries(self):
+        names = ['d{}/file{}.xml'.format(n % 7, n) for n in range(1000)]
+        self.write_list('\0'.join(names).encode())
+        self.assertEqual(names, list(DirectoryListProcessor._list_entries(self.list_file, block_size=7)))
+        self.write_list('\n'.join(names).encode() + b'\n')
+        self.assertEqual(names, list(DirectoryListProcessor._list_entries(self.list_file, block_size=5)))
+
+    def test_stdin(self):
+        stdin = mock.Mock(buffer=io.BytesIO(b'testfiles/f1.xml\ntestfiles/f2.xml\n'))
+        with mock.patch.object(sys, 'stdin', stdin):
+            dlp = DirectoryListProcessor('--infile-list - -od out'.split(), "Test", '.xml', '.foo')
+            self.assertEqual((2, 2), dlp.run(lambda ifn, ofn, _: os.path.exists(ifn)))
+
+    def test_run_include(self):
+        self.write_list(b'f1.xml\nf2.xml\nd1/f3.xml\n')
+        dlp = DirectoryListProcessor('--infile-list {} -id testfiles --include d1/*'.format(self.list_file).split(),
+                                     "Test", '.xml', '.foo')
+        self.assertEqual([('testfiles/d1/f3.xml', None)], [(ifn, ofn) for ifn, ofn, _ in dlp.iter_jobs()])
+
+    def test_with_infile(self):
+        dlp = DirectoryListProcessor('--infile-list x -i f1.xml'.split(), "Test", '.xml', '.foo', noexit=True)
+        self.assertFalse(dlp.successful_parse)
+
+
+class DecodeFileArgsTestCase(unittest.TestCase):
+    def test_order(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, text in (('f1', '-a 1 @{}/g'.format(tmpdir)), ('f2', '-b 2'), ('g', '-c 3')):
+                with open(os.path.join(tmpdir, name), 'w') as f:
+                    f.write(text)
+            dlp = DirectoryListProcessor([], "Test", '.xml', '.foo', fromfile_prefix_chars='@')
+            argv = ['-x', '@{}/f1'.format(tmpdir), '-y', '@{}/f2'.format(tmpdir)]
+            self.assertEqual(['-x', '-y', '-a', '1', '-b', '2', '-c', '3'], dlp.decode_file_args(argv))
+
+
+if __name__ == '__main__':
+    unittest.main()
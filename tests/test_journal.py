@@ -0,0 +1,103 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+from dirlistproc import DirectoryListProcessor
+from dirlistproc.Journal import Journal
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.journal = os.path.join(self.tmpdir.name, 'run.journal')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_journal_file(self):
+        journal = Journal(self.journal, sync_interval=3600)
+        journal.record('a', True)
+        journal.record('b', False)
+        journal.record('c', True)
+        journal.sync()
+        journal.record('c', False)
+        journal.record('b', True)
+        journal.close()
+        with open(self.journal, 'a') as f:
+            f.write('["d", tr')          # Crash in the middle of a write
+        self.assertEqual({'a', 'b'}, Journal.successes(self.journal))
+        self.assertEqual(set(), Journal.successes(os.path.join(self.tmpdir.name, 'missing')))
+
+        # A new journal replaces the old one
+        Journal(self.journal).close()
+        self.assertEqual(set(), Journal.successes(self.journal))
+
+    def test_resume(self):
+        args = "-id testfiles -od testout -s --journal".split() + [self.journal]
+        processed = []
+
+        def tproc(ifn, _, __):
+            processed.append(ifn)
+            return 'f2' not in ifn
+
+        dlp = DirectoryListProcessor(args, "Test", '.xml', ".foo")
+        nfiles, nsuccess = dlp.run(tproc)
+        self.assertEqual(nfiles - 1, nsuccess)
+        self.assertEqual(set(processed[:-1]), Journal.successes(self.journal))
+
+        # Resume picks up at the failure and carries on with the rest
+        def fixed_proc(ifn, _, __):
+            processed.append(ifn)
+            return True
+
+        finished = set(processed[:-1])
+        processed.clear()
+        dlp = DirectoryListProcessor(args + ['--resume'], "Test", '.xml', ".foo")
+        self.assertEqual((4 - len(finished), 4 - len(finished)), dlp.run(fixed_proc))
+        self.assertEqual(len(finished), dlp.nskipped)
+        self.assertFalse(finished & set(processed))
+        self.assertEqual(4, len(Journal.successes(self.journal)))
+
+        # Everything is done
+        self.assertEqual((0, 0), dlp.run(tproc))
+        self.assertEqual(4, dlp.nskipped)
+
+        # Without --resume, the journal starts again
+        dlp = DirectoryListProcessor(args, "Test", '.xml', ".foo")
+        self.assertEqual((4, 4), dlp.run(lambda *_: True, jobs=2, executor='thread'))
+
+    def test_resume_needs_journal(self):
+        with open(os.devnull, 'w') as devnull, redirect_stderr(devnull), self.assertRaises(SystemExit):
+            DirectoryListProcessor("-id testfiles --resume".split(), "Test", '.xml', ".foo")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+from dirlistproc import DirectoryListProcessor
+from dirlistproc.Manifest import Manifest, MANIFEST_NAME, hash_file
+
+
+def copy_proc(ifn, ofn, _):
+    os.makedirs(os.path.dirname(ofn), exist_ok=True)
+    with open(ifn) as inf, open(ofn, 'w') as outf:
+        outf.write(inf.read())
+    return 'bad' not in ifn
+
+
+class ManifestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.indir = os.path.join(self.tmpdir.name, 'in')
+        self.outdir = os.path.join(self.tmpdir.name, 'out')
+        for path in ('a.xml', 'bad.xml', os.path.join('d1', 'c.xml')):
+            self.write(path, path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, path: str, text: str) -> None:
+        fn = os.path.join(self.indir, path)
+        os.makedirs(os.path.dirname(fn), exist_ok=True)
+        with open(fn, 'w') as f:
+            f.write(text)
+
+    def test_hash_file(self):
+        fn = os.path.join(self.indir, 'a.xml')
+        digest, size = hash_file(fn)
+        self.assertEqual(5, size)
+        self.assertEqual((digest, size), hash_file(fn, chunk_size=2))
+
+    def test_batching(self):
+        path = os.path.join(self.tmpdir.name, 'm.sqlite')
+        manifest = Manifest(path, batch_size=2)
+        manifest.record('a', 'd1', 1, 'oa', True)
+        self.assertIsNone(Manifest(path).lookup('a'))
+        manifest.record('b', 'd2', 2, None, False)
+        self.assertEqual(('d2', 2, None, False), tuple(Manifest(path).lookup('b')))
+        manifest.record('a', 'd3', 3, 'oa', False)
+        manifest.close()
+        self.assertFalse(Manifest(path).lookup('a').success)
+
+    def test_manifest(self):
+        dlp = DirectoryListProcessor(["-id", self.indir, "-od", self.outdir, "--manifest"], "Test", ".xml", ".txt")
+        self.assertEqual((3, 2), dlp.run(copy_proc))
+        self.assertTrue(os.path.exists(os.path.join(self.outdir, MANIFEST_NAME)))
+
+        # Failures are always retried
+        processed = []
+
+        def tproc(ifn, ofn, opts):
+            processed.append(os.path.basename(ifn))
+            return copy_proc(ifn, ofn, opts)
+
+        self.assertEqual((1, 0), dlp.run(tproc))
+        self.assertEqual(2, dlp.nskipped)
+
+        # A new timestamp doesn't matter, new content or a missing output does
+        os.utime(os.path.join(self.indir, 'a.xml'))
+        self.write(os.path.join('d1', 'c.xml'), 'changed')
+        processed.clear()
+        self.assertEqual((2, 1), dlp.run(tproc))
+        self.assertEqual(['bad.xml', 'c.xml'], sorted(processed))
+        os.remove(os.path.join(self.outdir, 'a.txt'))
+        processed.clear()
+        self.assertEqual((2, 1), dlp.run(tproc))
+        self.assertEqual(['a.xml', 'bad.xml'], sorted(processed))
+        self.assertEqual(1, dlp.nskipped)
+
+    def test_manifest_path(self):
+        manifest = os.path.join(self.tmpdir.name, 'state', 'manifest.sqlite')
+        dlp = DirectoryListProcessor(["-id", self.indir, "-od", self.outdir, "--manifest", manifest, "-j", "2"],
+                                     "Test", ".xml", ".txt")
+        self.assertEqual((3, 2), dlp.run(copy_proc))
+        self.assertEqual((1, 0), dlp.run(copy_proc))
+        self.assertEqual(2, dlp.nskipped)
+        self.assertFalse(os.path.exists(os.path.join(self.outdir, MANIFEST_NAME)))
+
+    def test_manifest_needs_path(self):
+        with open(os.devnull, 'w') as devnull, redirect_stderr(devnull), self.assertRaises(SystemExit):
+            DirectoryListProcessor(["-id", self.indir, "--manifest"], "Test", ".xml", ".txt")
+
+
+if __name__ == '__main__':
+    unittest.main()
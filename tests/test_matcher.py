@@ -0,0 +1,149 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import unittest
+
+from dirlistproc import DirectoryListProcessor
+from dirlistproc.FileMatcher import FileMatcher
+
+
+class FileMatcherTestCase(unittest.TestCase):
+    def test_suffixes(self):
+        matcher = FileMatcher(('.xml', '.txt'))
+        self.assertTrue(matcher.matches('f1.xml', 'f1.xml'))
+        self.assertTrue(matcher.matches('f1.txt', 'f1.txt'))
+        self.assertFalse(matcher.matches('f1.json', 'f1.json'))
+        self.assertFalse(matcher.matches('.f1.xml', '.f1.xml'))
+        self.assertTrue(FileMatcher(('.xml', ), skip_hidden=False).matches('.f1.xml', '.f1.xml'))
+        self.assertFalse(matcher.needs_path)
+
+    def test_globs(self):
+        matcher = FileMatcher(include=['*.xml'], exclude=['f2.*', 'd1/d2/*'])
+        self.assertTrue(matcher.needs_path)
+        self.assertTrue(matcher.matches('f1.xml', 'f1.xml'))
+        self.assertTrue(matcher.matches('f3.xml', 'd1/f3.xml'))
+        self.assertFalse(matcher.matches('f1.txt', 'f1.txt'))
+        self.assertFalse(matcher.matches('f2.xml', 'd1/f2.xml'))
+        self.assertFalse(matcher.matches('f4.xml', 'd1/d2/f4.xml'))
+        self.assertTrue(matcher.matches('f4.xml', 'd3/d1/d2/f4.xml'))
+
+    def test_regexes(self):
+        matcher = FileMatcher(include_re=[r'\d\.xml$'], exclude_re=['^d1/'])
+        self.assertTrue(matcher.matches('f1.xml', 'f1.xml'))
+        self.assertFalse(matcher.matches('f.xml', 'f.xml'))
+        self.assertFalse(matcher.matches('f3.xml', 'd1/f3.xml'))
+        self.assertTrue(matcher.matches('f3.xml', 'x/d1/f3.xml'))
+
+    def test_regex_flags(self):
+        """ Global inline flags only work at the start of a pattern, so each regex is compiled on its own """
+        matcher = FileMatcher(include=['*.txt'], include_re=['(?i)F1', '(?s)^d2/'], exclude_re=['(?i)^D1/'])
+        self.assertTrue(matcher.matches('f1.xml', 'f1.xml'))
+        self.assertTrue(matcher.matches('f3.xml', 'd2/f3.xml'))
+        self.assertTrue(matcher.matches('a.txt', 'a.txt'))
+        self.assertFalse(matcher.matches('f2.xml', 'f2.xml'))
+        self.assertFalse(matcher.matches('f1.xml', 'd1/f1.xml'))
+
+    def test_prunes(self):
+        matcher = FileMatcher(exclude_dir=['d2', 'a/b'])
+        self.assertFalse(matcher.needs_path)
+        self.assertTrue(matcher.prunes('d1/d2'))
+        self.assertTrue(matcher.prunes('d2'))
+        self.assertTrue(matcher.prunes('a/b'))
+        self.assertFalse(matcher.prunes('x/a/b'))
+        self.assertFalse(matcher.prunes('d1'))
+        self.assertFalse(FileMatcher().prunes('d1'))
+
+
+class MatcherOptionsTestCase(unittest.TestCase):
+    @staticmethod
+    def names(args, infile_suffix='.xml', *filters):
+        dlp = DirectoryListProcessor(args.split(), "Test", infile_suffix, ".foo")
+        return sorted((ifn, ofn) for ifn, ofn, _ in dlp.iter_jobs(*filters))
+
+    def test_include_exclude(self):
+        self.assertEqual([('testfiles/d1/d2/f4.xml', 'testout/d1/d2/f4.foo'),
+                          ('testfiles/d1/f3.xml', 'testout/d1/f3.foo')],
+                         self.names("-id testfiles -od testout --include d1/* --include-re d2/"))
+        self.assertEqual([('testfiles/d1/f3.xml', 'testout/d1/f3.foo'),
+                          ('testfiles/f1.xml', 'testout/f1.foo')],
+                         self.names("-id testfiles -od testout --exclude f2.* --exclude-re d2/"))
+
+    def test_exclude_dir(self):
+        visited = []
+
+        def filtr(fn):
+            visited.append(fn)
+            return True
+
+        self.assertEqual([('testfiles/f1.xml', 'testout/f1.foo'),
+                          ('testfiles/f2.xml', 'testout/f2.foo')],
+                         self.names("-id testfiles -od testout --exclude-dir d1", '.xml', filtr))
+        self.assertNotIn('f3.xml', visited)
+        self.assertNotIn('f4.xml', visited)
+        self.assertEqual(['testfiles/d1/f3.xml', 'testfiles/f1.xml', 'testfiles/f2.xml'],
+                         [ifn for ifn, _ in self.names("-id testfiles -od testout --exclude-dir d1/d2")])
+
+    def test_filters_after_matcher(self):
+        visited = []
+
+        def filtr(fn):
+            visited.append(fn)
+            return fn != 'f1.xml'
+
+        self.assertEqual([('testfiles/f2.xml', 'testout/f2.foo')],
+                         self.names("-id testfiles -od testout --exclude-dir d1", '.xml', filtr))
+        self.assertEqual(['f1.xml', 'f2.xml'], sorted(visited))
+
+    def test_multiple_suffixes(self):
+        self.assertEqual([('testfiles/f1.txt', 'testout/f1.foo'),
+                          ('testfiles/f1.xml', 'testout/f1.foo'),
+                          ('testfiles/f2.txt', 'testout/f2.foo'),
+                          ('testfiles/f2.xml', 'testout/f2.foo')],
+                         self.names("-id testfiles -od testout --exclude-dir d1", ['.xml', '.txt']))
+
+    def test_no_suffix(self):
+        self.assertEqual(['testout/f1.txt.foo', 'testout/f1.xml.foo'],
+                         [ofn for _, ofn in self.names("-id testfiles -od testout --include f1.*", None)])
+
+    def test_infile(self):
+        self.assertEqual([('f1.xml', 'testout/f1.foo')], self.names("-i f1.xml f2.xml -od testout --exclude f2.*"))
+
+    def test_url(self):
+        self.assertEqual([('http://example.org/a', 'testout/_url1.foo')],
+                         self.names("-i http://example.org/a http://example.org/b -od testout --exclude-re /b$"))
+
+    def test_regex_flags(self):
+        self.assertEqual([('testfiles/f1.xml', 'testout/f1.foo')],
+                         self.names("-id testfiles -od testout --include-re (?i)F1 --include d2/*"))
+
+    def test_bad_regex(self):
+        dlp = DirectoryListProcessor("-id testfiles --include-re (".split(), "Test", ".xml", ".foo", noexit=True)
+        self.assertFalse(dlp.successful_parse)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import mmap
+import os
+import tempfile
+import unittest
+
+from dirlistproc import DirectoryListProcessor
+
+
+def size_proc(ifn, _, __, data):
+    return ifn.endswith('empty.txt') == (len(data) == 0) and data[:4] == b'line'[:len(data)]
+
+
+class MmapTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.indir = self.tmpdir.name
+        for name, size in (('a.txt', 10), ('b.txt', 100000), ('empty.txt', 0)):
+            with open(os.path.join(self.indir, name), 'wb') as f:
+                f.write((b'line\n' * size)[:size * 5])
+        self.mappings = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def proc(self, ifn, ofn, opts, data):
+        self.mappings.append(data)
+        with open(ifn, 'rb') as f:
+            self.assertEqual(f.read(), bytes(data))
+        if isinstance(data, mmap.mmap):
+            self.assertFalse(data.closed)
+
+    def test_mmap(self):
+        dlp = DirectoryListProcessor(['-id', self.indir], "Test", '.txt', None)
+        self.assertEqual((3, 3), dlp.run(self.proc, input_mode="mmap"))
+        self.assertEqual(3, len(self.mappings))
+        self.assertEqual([b''], [data for data in self.mappings if not isinstance(data, mmap.mmap)])
+        self.assertTrue(all(data.closed for data in self.mappings if isinstance(data, mmap.mmap)))
+
+    def test_closed_on_error(self):
+        def bad_proc(ifn, ofn, opts, data):
+            self.mappings.append(data)
+            raise ValueError("Bad data")
+
+        dlp = DirectoryListProcessor(['-id', self.indir, '--include', 'b.txt'], "Test", '.txt', None)
+        self.assertEqual((1, 0), dlp.run(bad_proc, input_mode="mmap"))
+        self.assertTrue(self.mappings[0].closed)
+
+    def test_stdin(self):
+        dlp = DirectoryListProcessor([], "Test", '.txt', None)
+        self.assertEqual((1, 1), dlp.run(lambda ifn, ofn, opts, data: ifn is None and data is None,
+                                         input_mode="mmap"))
+
+    def test_parallel(self):
+        dlp = DirectoryListProcessor(['-id', self.indir], "Test", '.txt', None)
+        self.assertEqual((3, 3), dlp.run(size_proc, jobs=2, input_mode="mmap"))
+        self.assertEqual((3, 3), dlp.run(size_proc, jobs=2, executor="thread", input_mode="mmap"))
+
+    def test_bad_mode(self):
+        dlp = DirectoryListProcessor([], "Test", '.txt', None)
+        with self.assertRaises(ValueError):
+            dlp.run(self.proc, input_mode="read")
+
+
+if __name__ == '__main__':
+    unittest.main()
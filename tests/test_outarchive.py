@@ -0,0 +1,110 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from dirlistproc import DirectoryListProcessor
+from dirlistproc.ArchiveOutput import archive_format
+
+
+def copy_upper(ifn, ofn, _):
+    """ Process function for the pool tests - it has to be picklable """
+    if ifn.endswith('f2.xml'):
+        with open(ofn, 'w') as f:
+            f.write('partial')
+        return False
+    with open(ifn) as inf, open(ofn, 'w') as outf:
+        outf.write(inf.read().upper())
+    return True
+
+
+class OutArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_dlp(self, archive, args=''):
+        path = os.path.join(self.tmpdir.name, archive)
+        dlp = DirectoryListProcessor('-id testfiles --outarchive {} {}'.format(path, args).split(), "Test", '.xml',
+                                     '.foo')
+        return path, dlp.run(copy_upper)
+
+    def expected(self):
+        with open(os.path.join('testfiles', 'd1', 'f3.xml')) as f:
+            return f.read().upper()
+
+    def test_tar(self):
+        for archive in ('out.tar', 'out.tar.gz', 'out.tgz', 'out.tar.bz2', 'out.tar.xz'):
+            path, (nfiles, nsuccess) = self.run_dlp(archive)
+            self.assertEqual(nfiles - 1, nsuccess)
+            with tarfile.open(path) as tar:
+                names = tar.getnames()
+                self.assertEqual(nsuccess, len(names))
+                self.assertIn('d1/f3.foo', names)
+                self.assertNotIn('f2.foo', names)
+                self.assertEqual(self.expected(), tar.extractfile('d1/f3.foo').read().decode())
+
+    def test_zip_parallel(self):
+        for executor in ('thread', 'process'):
+            path, (nfiles, nsuccess) = self.run_dlp('out.zip', '-j 2 --executor ' + executor)
+            with zipfile.ZipFile(path) as zf:
+                self.assertEqual(nsuccess, len(zf.namelist()))
+                self.assertEqual(self.expected(), zf.read('d1/f3.foo').decode())
+
+    def test_flatten(self):
+        path, _ = self.run_dlp('out.zip', '-f --include d1/* --exclude-dir d2')
+        with zipfile.ZipFile(path) as zf:
+            self.assertEqual(['f3.foo'], zf.namelist())
+
+    def test_output_names(self):
+        path = os.path.join(self.tmpdir.name, 'out.zip')
+        dlp = DirectoryListProcessor('-id testfiles --outarchive {} --include d1/* --exclude-dir d2'.format(path)
+                                     .split(), "Test", '.xml', '.foo')
+        self.assertEqual([os.path.join(path, 'd1', 'f3.foo')], [ofn for _, ofn, _ in dlp.iter_jobs()])
+        self.assertFalse(os.path.exists(path))
+
+    def test_format(self):
+        self.assertEqual('.zip', archive_format('a/b.zip'))
+        self.assertEqual('.tar.gz', archive_format('b.tar.gz'))
+        self.assertEqual('.tar', archive_format('b.tar'))
+        self.assertIsNone(archive_format('b.gz'))
+
+    def test_validation(self):
+        for args in ('--outarchive out.rar', '--outarchive out.zip -od out', '--outarchive out.zip --atomic',
+                     '--outarchive out.zip --incremental', '--outarchive out.zip --journal j --resume'):
+            dlp = DirectoryListProcessor(args.split(), "Test", '.xml', '.foo', noexit=True)
+            self.assertFalse(dlp.successful_parse, args)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stderr
+
+from dirlistproc import DirectoryListProcessor
+
+
+# Processors used by a process pool have to be picklable, so they live at module level
+def pass_proc(ifn, ofn, _):
+    return ifn.endswith('.xml') and ofn.endswith('.foo')
+
+
+def f1_proc(ifn, _, __):
+    return 'f1' in ifn
+
+
+def fail_proc(_, __, ___):
+    return False
+
+
+class ProcessPoolTestCase(unittest.TestCase):
+    def test_jobs_option(self):
+        dlp = DirectoryListProcessor("-id testfiles -od testout -j 2".split(), "Test", '.xml', ".foo")
+        self.assertEqual(2, dlp.opts.jobs)
+        self.assertEqual((4, 4), dlp.run(pass_proc))
+        self.assertEqual((4, 1), dlp.run(f1_proc))
+
+    def test_jobs_argument(self):
+        dlp = DirectoryListProcessor("-id testfiles -od testout".split(), "Test", '.xml', ".foo")
+        self.assertEqual((4, 4), dlp.run(pass_proc, jobs=3))
+        self.assertEqual((4, 4), dlp.run(pass_proc, jobs=0))
+        self.assertEqual((4, 1), dlp.run(f1_proc, jobs=2))
+
+    def test_infile_list(self):
+        args = "-i testfiles/f1.xml testfiles/f2.xml testfiles/d1/f3.xml -od testout"
+        dlp = DirectoryListProcessor(args.split(), "Test", '.xml', ".foo")
+        self.assertEqual((3, 3), dlp.run(pass_proc, jobs=2))
+
+    def test_stop_on_error(self):
+        dlp = DirectoryListProcessor("-id testfiles -od testout -s -j 2".split(), "Test", '.xml', ".foo")
+        nfiles, nsuccess = dlp.run(fail_proc)
+        self.assertEqual(0, nsuccess)
+        self.assertTrue(1 <= nfiles <= 4)
+
+    def test_bad_jobs(self):
+        with self.assertRaises(SystemExit):
+            DirectoryListProcessor("-id testfiles -j -1".split(), "Test", '.xml', ".foo")
+
+
+class ThreadPoolTestCase(unittest.TestCase):
+    def test_thread_executor(self):
+        dlp = DirectoryListProcessor("-id testfiles -od testout -j 4 --executor thread".split(), "Test", '.xml', ".foo")
+        self.assertEqual('thread', dlp.opts.executor)
+        lock = threading.Lock()
+        active = [0, 0]             # current, maximum
+
+        # Closures are fine - nothing is pickled for threads
+        def tproc(ifn, _, __):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return 'f1' in ifn
+
+        self.assertEqual((4, 1), dlp.run(tproc))
+        self.assertGreater(active[1], 1)
+
+    def test_executor_argument(self):
+        dlp = DirectoryListProcessor("-id testfiles -od testout".split(), "Test", '.xml', ".foo")
+        self.assertEqual((4, 4), dlp.run(pass_proc, jobs=0, executor='thread'))
+        with self.assertRaises(ValueError):
+            dlp.run(pass_proc, jobs=2, executor='fiber')
+
+    def test_filters(self):
+        dlp = DirectoryListProcessor("-id testfiles -od testout".split(), "Test", '.xml', ".foo")
+        self.assertEqual((3, 3), dlp.run(pass_proc, lambda fn: 'f4' not in fn, jobs=2, executor='thread'))
+
+    def test_stop_on_error(self):
+        dlp = DirectoryListProcessor("-id testfiles -od testout -s".split(), "Test", '.xml', ".foo")
+        nfiles, nsuccess = dlp.run(fail_proc, jobs=2, executor='thread')
+        self.assertEqual(0, nsuccess)
+        self.assertTrue(1 <= nfiles <= 4)
+
+
+class ShardTestCase(unittest.TestCase):
+    def test_shards(self):
+        all_files = {ifn for ifn, _, _ in
+                     DirectoryListProcessor("-id testfiles".split(), "Test", '', "").iter_jobs(lambda _: True)}
+        for n in (1, 2, 3, 7):
+            shards = []
+            for k in range(1, n + 1):
+                seen = set()
+                dlp = DirectoryListProcessor("-id testfiles --shard {}/{}".format(k, n).split(), "Test", '', "")
+                self.assertEqual((k, n), dlp.opts.shard)
+                nfiles, _ = dlp.run(lambda ifn, _, __: seen.add(ifn), lambda _: True)
+                self.assertEqual(len(seen), nfiles)
+                shards.append(seen)
+            self.assertEqual(all_files, set().union(*shards))
+            self.assertEqual(len(all_files), sum(len(shard) for shard in shards))
+
+    def test_relative_path(self):
+        # The same file is in the same shard whether it comes from a directory walk or an input list
+        walked = DirectoryListProcessor("-id testfiles --shard 2/3".split(), "Test", '.xml', "")
+        listed = DirectoryListProcessor("-i d1/f3.xml -id testfiles --shard 2/3".split(), "Test", '.xml', "")
+        self.assertEqual(walked.in_shard('testfiles/d1/f3.xml'), listed.in_shard('testfiles/d1/f3.xml'))
+        listed = DirectoryListProcessor("-i d1/f3.xml --shard 2/3".split(), "Test", '.xml', "")
+        self.assertEqual(walked.in_shard('testfiles/d1/f3.xml'), listed.in_shard('d1/f3.xml'))
+
+    def test_bad_shard(self):
+        with open(os.devnull, 'w') as devnull, redirect_stderr(devnull):
+            for shard in ('0/2', '3/2', '1', 'a/b'):
+                with self.assertRaises(SystemExit):
+                    DirectoryListProcessor(["--shard", shard], "Test", '.xml', "")
+
+
+class ScheduleTestCase(unittest.TestCase):
+    def test_largest_first(self):
+        sizes = [5, 300, 20, 4000, 1, 80, 600]
+        with tempfile.TemporaryDirectory() as indir:
+            infiles = []
+            for i, size in enumerate(sizes):
+                infiles.append(os.path.join(indir, 'f{}.xml'.format(i)))
+                with open(infiles[-1], 'w') as f:
+                    f.write('x' * size)
+
+            def order(*args: str):
+                processed = []
+                dlp = DirectoryListProcessor(["-i"] + infiles + list(args), "Test", '.xml', "")
+                self.assertEqual((len(sizes), len(sizes)), dlp.run(lambda ifn, _, __: processed.append(ifn)))
+                return [os.path.getsize(ifn) for ifn in processed]
+
+            self.assertEqual(sizes, order())
+            self.assertEqual(sizes, order("--schedule", "walk"))
+            self.assertEqual(sorted(sizes, reverse=True), order("--schedule", "largest-first"))
+            self.assertEqual([300, 20, 4000, 5, 80, 600, 1], order("--schedule", "largest-first", "--lookahead", "2"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import io
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stderr
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dirlistproc import DirectoryListProcessor
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.server.clients.add(self.client_address)
+        if self.path.startswith('/moved/'):
+            self.send_response(302)
+            self.send_header('Location', '/' + self.path[len('/moved/'):])
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path.startswith('/missing'):
+            self.send_error(404)
+        else:
+            body = self.path.encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PrefetchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.requests = []
+        self.server.clients = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = 'http://127.0.0.1:{}/'.format(self.server.server_address[1])
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def run_dlp(self, paths, args=''):
+        """ Run over the URLs for paths, returning the run result and what proc was given for each output """
+        seen = {}
+
+        def proc(ifn, ofn, _):
+            if '://' in ifn:
+                seen[os.path.basename(ofn)] = (ifn, None)
+                return False
+            with open(ifn) as f:
+                seen[os.path.basename(ofn)] = (ifn, f.read())
+            return True
+
+        urls = ' '.join(self.base + path for path in paths)
+        dlp = DirectoryListProcessor('-i {} -od out {}'.format(urls, args).split(), "Test", None, '.out')
+        return dlp.run(proc), seen
+
+    def test_prefetch(self):
+        paths = ['d/f{}.xml'.format(n) for n in range(8)]
+        (nfiles, nsuccess), seen = self.run_dlp(paths, '--prefetch 2')
+        self.assertEqual((8, 8), (nfiles, nsuccess))
+        for n, path in enumerate(paths):
+            ifn, text = seen['_url{}.out'.format(n + 1)]
+            self.assertEqual('/' + path, text)
+            self.assertTrue(ifn.endswith('-f{}.xml'.format(n)))
+            self.assertFalse(os.path.exists(ifn))
+        self.assertFalse(os.path.exists(os.path.dirname(seen['_url1.out'][0])))
+
+    def test_repeated_url(self):
+        """ Each job for a repeated URL gets a download that lasts until it is done """
+        for args in ('--prefetch 2', '--prefetch 2 --fetch-cache ' + os.path.join(self.tmpdir.name, 'cache')):
+            journal = os.path.join(self.tmpdir.name, 'run.journal')
+            (nfiles, nsuccess), seen = self.run_dlp(['r.xml', 'r.xml', 'r.xml'], args + ' --journal ' + journal)
+            self.assertEqual((3, 3), (nfiles, nsuccess), args)
+            self.assertEqual(['/r.xml'] * 3, [text for _, text in seen.values()])
+            with open(journal) as f:
+                self.assertEqual(3, f.read().count(self.base + 'r.xml'))
+
+    def test_connection_reuse(self):
+        self.run_dlp(['f{}'.format(n) for n in range(6)], '--prefetch 1')
+        self.assertEqual(6, len(self.server.requests))
+        self.assertEqual(1, len(self.server.clients))
+
+    def test_cache(self):
+        cache = os.path.join(self.tmpdir.name, 'cache')
+        paths = ['a.xml', 'b.xml']
+        for _ in range(2):
+            (_, nsuccess), seen = self.run_dlp(paths, '--prefetch --fetch-cache ' + cache)
+            self.assertEqual(2, nsuccess)
+        self.assertEqual(['/a.xml', '/b.xml'], sorted(self.server.requests))
+        self.assertTrue(os.path.exists(seen['_url1.out'][0]))
+        self.assertEqual(2, len(os.listdir(cache)))
+
+    def test_redirect(self):
+        _, seen = self.run_dlp(['moved/x.xml'], '--prefetch')
+        self.assertEqual('/x.xml', seen['_url1.out'][1])
+
+    def test_failure(self):
+        err = io.StringIO()
+        with redirect_stderr(err):
+            (nfiles, nsuccess), seen = self.run_dlp(['missing.xml', 'y.xml'], '--prefetch')
+        self.assertEqual((2, 1), (nfiles, nsuccess))
+        self.assertEqual((self.base + 'missing.xml', None), seen['_url1.out'])
+        self.assertIn('HTTP 404', err.getvalue())
+
+    def test_journal_names_urls(self):
+        journal = os.path.join(self.tmpdir.name, 'run.journal')
+        self.run_dlp(['j.xml'], '--prefetch --journal ' + journal)
+        with open(journal) as f:
+            self.assertIn(self.base + 'j.xml', f.read())
+
+    def test_validation(self):
+        for args in ('--prefetch 0', '--fetch-cache x'):
+            dlp = DirectoryListProcessor(args.split(), "Test", None, '.out', noexit=True)
+            self.assertFalse(dlp.successful_parse, args)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import asyncio
+import contextlib
+import io
+import os
+import pstats
+import tempfile
+import unittest
+
+from dirlistproc import DirectoryListProcessor
+
+
+def busy_proc(ifn, _, __):
+    return sum(range(1000)) > 0
+
+
+def sampled_proc(ifn, _, __):
+    return True
+
+
+def busy_batch(batch, _):
+    return [sum(range(1000)) > 0 for _ in batch]
+
+
+class ProfileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.profile = os.path.join(self.tmpdir.name, 'run.prof')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def ncalls(self, args, proc, **kwargs) -> int:
+        """ Run proc under --profile and return the number of times the profile saw it called """
+        dlp = DirectoryListProcessor(['-id', 'testfiles', '--profile', self.profile] + args, "Test", '.xml', None)
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err):
+            self.assertEqual((4, 4), dlp.run(proc, **kwargs))
+        self.assertIn(proc.__name__, err.getvalue())
+        stats = pstats.Stats(self.profile).stats
+        return sum(ncalls for (_, _, fname), (_, ncalls, _, _, _) in stats.items() if fname == proc.__name__)
+
+    def test_serial(self):
+        self.assertEqual(4, self.ncalls([], busy_proc))
+
+    def test_threads(self):
+        self.assertEqual(4, self.ncalls([], busy_proc, jobs=2, executor='thread'))
+
+    def test_processes(self):
+        self.assertEqual(4, self.ncalls([], busy_proc, jobs=2))
+
+    def test_sample(self):
+        self.assertEqual(2, self.ncalls(['--profile-sample', '2'], sampled_proc))
+
+    def test_batched(self):
+        for kwargs in (dict(), dict(jobs=2)):
+            dlp = DirectoryListProcessor(['-id', 'testfiles', '--profile', self.profile], "Test", '.xml', None)
+            err = io.StringIO()
+            with contextlib.redirect_stderr(err):
+                self.assertEqual((4, 4), dlp.run_batched(busy_batch, batch_size=2, **kwargs))
+            stats = pstats.Stats(self.profile).stats
+            self.assertEqual(2, sum(ncalls for (_, _, fname), (_, ncalls, _, _, _) in stats.items()
+                                    if fname == 'busy_batch'))
+
+    def test_async(self):
+        async def proc(ifn, ofn, opts):
+            return True
+
+        dlp = DirectoryListProcessor(['-id', 'testfiles', '--profile', self.profile], "Test", '.xml', None)
+        with self.assertRaises(ValueError):
+            asyncio.run(dlp.run_async(proc))
+
+    def test_options(self):
+        for args in (['--profile-sample', '2'], ['--profile', self.profile, '--profile-sample', '0']):
+            dlp = DirectoryListProcessor(['-id', 'testfiles'] + args, "Test", '.xml', None, noexit=True)
+            self.assertFalse(dlp.successful_parse)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import contextlib
+import io
+import time
+import unittest
+
+from dirlistproc import DirectoryListProcessor
+from dirlistproc.Progress import Progress
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class ProgressTestCase(unittest.TestCase):
+    def test_display(self):
+        stream = Terminal()
+        progress = Progress(stream, lambda: 2, interval=0.01)
+        jobs = progress.track(range(8))
+        for _ in range(3):
+            next(jobs)
+            progress.done += 1
+        time.sleep(0.05)
+        self.assertIn('5/5+ files', stream.getvalue())
+        list(jobs)
+        progress.done += 5
+        progress.close()
+        lines = stream.getvalue().split('\r')
+        self.assertTrue(lines[-1].startswith('10/10 files (100.0%)'))
+        self.assertTrue(lines[-1].endswith('\n'))
+
+    def test_count(self):
+        stream = Terminal()
+        progress = Progress(stream, lambda: 0, candidates=range(100), interval=0.01)
+        time.sleep(0.05)
+        progress.done = 25
+        time.sleep(0.05)
+        self.assertIn('25/100 files (25.0%)', stream.getvalue())
+        self.assertIn('ETA', stream.getvalue())
+        progress.close()
+
+    def test_run(self):
+        for mode in ('estimate', 'count'):
+            stderr = Terminal()
+            with contextlib.redirect_stderr(stderr):
+                dlp = DirectoryListProcessor(['-id', 'testfiles', '--progress', mode], "Test", '.xml', None)
+                self.assertEqual((4, 4), dlp.run(lambda *_: None))
+            self.assertTrue(stderr.getvalue().split('\r')[-1].startswith('4/4 files (100.0%)'))
+
+    def test_not_a_terminal(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            dlp = DirectoryListProcessor(['-id', 'testfiles', '--progress'], "Test", '.xml', None)
+            self.assertEqual((4, 4), dlp.run(lambda *_: None))
+        self.assertEqual('', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from dirlistproc import DirectoryListProcessor
+from dirlistproc.RunStats import Histogram, RunStats, Timing
+
+
+def sleepy_proc(ifn, _, __):
+    time.sleep(0.05 if ifn.endswith('f4.xml') else 0.001)
+    return not ifn.endswith('f2.xml')
+
+
+class HistogramTestCase(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = Histogram()
+        for value in range(1, 10001):
+            histogram.record(value)
+        self.assertEqual(10000, histogram.total)
+        self.assertEqual(1, histogram.min)
+        self.assertEqual(10000, histogram.max)
+        for pct in (50, 90, 99):
+            self.assertAlmostEqual(pct * 100, histogram.percentile(pct), delta=pct * 100 / 16)
+        self.assertEqual(10000, histogram.percentile(100))
+        self.assertEqual(0, Histogram().percentile(50))
+
+    def test_constant_size(self):
+        histogram = Histogram()
+        nbuckets = len(histogram.counts)
+        for value in (0, 1, 15, 16, 17, 1 << 40, (1 << 64) - 1):
+            histogram.record(value)
+        self.assertEqual(nbuckets, len(histogram.counts))
+        self.assertEqual(0, histogram.percentile(1))
+
+    def test_slowest(self):
+        stats = RunStats(nslowest=2)
+        for n in range(10):
+            stats.record('f{}'.format(n), n != 3, Timing(n / 10, n / 100, n))
+        summary = stats.summary(nskipped=4)
+        self.assertEqual(['f9', 'f8'], [entry['file'] for entry in summary['slowest']])
+        self.assertEqual((10, 9, 1, 4, 45), (summary['files'], summary['successes'], summary['failures'],
+                                             summary['skipped'], summary['input_bytes']))
+
+
+    def test_untimed(self):
+        """ Nothing measured is reported as null rather than as zeros """
+        stats = RunStats()
+        stats.record('f1', True)
+        summary = stats.summary()
+        self.assertEqual((1, 0), (summary['files'], summary['timed_files']))
+        self.assertEqual((None, None, None, None), (summary['input_bytes'], summary['bytes_per_second'],
+                                                    summary['wall_seconds'], summary['cpu_seconds']))
+        self.assertEqual([], summary['slowest'])
+
+
+class StatsOptionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.stats_file = os.path.join(self.tmpdir.name, 'stats.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_stats(self, **kwargs) -> dict:
+        dlp = DirectoryListProcessor(['-id', 'testfiles', '--stats', self.stats_file], "Test", '.xml', None)
+        self.assertEqual((4, 3), dlp.run(sleepy_proc, **kwargs))
+        with open(self.stats_file) as f:
+            return json.load(f)
+
+    def test_serial(self):
+        summary = self.run_stats()
+        self.assertEqual((4, 3, 1), (summary['files'], summary['successes'], summary['failures']))
+        self.assertEqual('testfiles/d1/d2/f4.xml', summary['slowest'][0]['file'])
+        self.assertGreaterEqual(summary['wall_seconds']['max'], 0.05)
+        self.assertGreaterEqual(summary['wall_seconds']['p99'], summary['wall_seconds']['p50'])
+        self.assertLess(summary['cpu_seconds']['max'], 0.05)
+        self.assertGreater(summary['files_per_second'], 0)
+        self.assertGreater(summary['traversal_seconds'], 0)
+        self.assertGreater(summary['filter_seconds'], 0)
+
+    def test_planning_separate(self):
+        """ Time spent in later planning stages isn't counted as traversal """
+        stats = RunStats()
+
+        def slow_stage(items):
+            for item in items:
+                time.sleep(0.05)
+                yield item
+
+        self.assertEqual([1, 2], list(stats.timed_plan(slow_stage(stats.timed_traversal([1, 2])))))
+        summary = stats.summary()
+        self.assertLess(summary['traversal_seconds'], 0.05)
+        self.assertGreaterEqual(summary['planning_seconds'], 0.1)
+
+    def test_parallel(self):
+        for executor in ('thread', 'process'):
+            summary = self.run_stats(jobs=2, executor=executor)
+            self.assertEqual(4, summary['files'])
+            self.assertEqual('testfiles/d1/d2/f4.xml', summary['slowest'][0]['file'])
+
+    def test_batched(self):
+        """ Each file is charged an equal share of its batch's time """
+        def batch_proc(pairs, opts):
+            for ifn, ofn in pairs:
+                sleepy_proc(ifn, ofn, opts)
+
+        dlp = DirectoryListProcessor(['-id', 'testfiles', '--stats', self.stats_file], "Test", '.xml', None)
+        self.assertEqual((4, 4), dlp.run_batched(batch_proc, batch_size=3))
+        with open(self.stats_file) as f:
+            summary = json.load(f)
+        self.assertEqual((4, 4), (summary['successes'], summary['timed_files']))
+        self.assertEqual(4, len(summary['slowest']))
+        self.assertEqual(0, summary['input_bytes'])
+        self.assertGreaterEqual(summary['wall_seconds']['total'], 0.05)
+        self.assertIsNotNone(summary['cpu_seconds'])
+
+    def test_async(self):
+        """ Coroutines are timed by the wall clock only """
+        async def proc(ifn, _, __):
+            await asyncio.sleep(0.05 if ifn.endswith('f4.xml') else 0.001)
+            return not ifn.endswith('f2.xml')
+
+        dlp = DirectoryListProcessor(['-id', 'testfiles', '--stats', self.stats_file], "Test", '.xml', None)
+        self.assertEqual((4, 3), asyncio.run(dlp.run_async(proc)))
+        with open(self.stats_file) as f:
+            summary = json.load(f)
+        self.assertEqual(4, summary['timed_files'])
+        self.assertEqual('testfiles/d1/d2/f4.xml', summary['slowest'][0]['file'])
+        self.assertIsNone(summary['slowest'][0]['cpu_seconds'])
+        self.assertGreaterEqual(summary['wall_seconds']['max'], 0.05)
+        self.assertIsNone(summary['cpu_seconds'])
+        self.assertEqual(0, summary['input_bytes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,266 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from functools import partial
+from unittest import mock
+
+from dirlistproc import DirectoryListProcessor
+from dirlistproc.Watcher import Watcher
+
+
+def write(path, text, age=0.0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+    if age:
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+
+
+def log(path, line):
+    with open(path, 'a') as f:
+        f.write(line + '\n')
+
+
+def log_init(path, _):
+    log(path, 'init')
+    return path
+
+
+def log_final(path):
+    log(path, 'final')
+
+
+def log_proc(_, __, opts):
+    log(opts.worker_context, 'proc')
+
+
+def log_batch(pairs, opts):
+    for _ in pairs:
+        log(opts.worker_context, 'proc')
+
+
+async def log_proc_async(_, __, opts):
+    log(opts.worker_context, 'proc')
+
+
+class WatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.indir = os.path.join(self.tmpdir.name, 'in')
+        os.mkdir(self.indir)
+        self.seen = []
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def proc(self, ifn, ofn, _):
+        with open(ifn) as f, self.lock:
+            self.seen.append((os.path.relpath(ifn, self.indir), f.read(), ofn))
+        return not ifn.endswith('bad.xml')
+
+    def wait_for(self, n, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if len(self.seen) >= n:
+                    return
+            time.sleep(0.02)
+        self.fail("Only saw {}".format(self.seen))
+
+    def start(self, args='', run=None):
+        dlp = DirectoryListProcessor('-id {} -od out --watch 0.05 --settle 0.2 {}'.format(self.indir, args).split(),
+                                     "Test", '.xml', '.foo')
+        result = []
+        thread = threading.Thread(target=lambda: result.append(run(dlp) if run else dlp.run(self.proc)))
+        thread.start()
+        return dlp, thread, result
+
+    def check_watch(self, run=None):
+        write(os.path.join(self.indir, 'old.xml'), 'old', age=60)
+        write(os.path.join(self.indir, 'skip.txt'), 'skip', age=60)
+        dlp, thread, result = self.start(run=run)
+        try:
+            self.wait_for(1)
+            write(os.path.join(self.indir, 'd1', 'new.xml'), 'new')
+            self.wait_for(2)
+            time.sleep(0.05)
+            write(os.path.join(self.indir, 'old.xml'), 'changed')
+            self.wait_for(3)
+            time.sleep(0.3)
+        finally:
+            dlp.stop_watching()
+            thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([('old.xml', 'old', 'out/old.foo'),
+                          (os.path.join('d1', 'new.xml'), 'new', os.path.join('out', 'd1', 'new.foo')),
+                          ('old.xml', 'changed', 'out/old.foo')], self.seen)
+        self.assertEqual([(3, 3)], result)
+
+    def test_watch(self):
+        self.check_watch()
+
+    def test_watch_polling(self):
+        with mock.patch('dirlistproc.Watcher._inotify', return_value=None):
+            self.check_watch()
+
+    def test_watch_async(self):
+        async def proc(ifn, ofn, opts):
+            return self.proc(ifn, ofn, opts)
+
+        self.check_watch(lambda dlp: asyncio.run(dlp.run_async(proc)))
+
+    def test_entry_filter(self):
+        """ Later rounds hand entry_filter entries built from the watcher's stat """
+        write(os.path.join(self.indir, 'a.xml'), 'a', age=60)
+        sizes = []
+        dlp, thread, result = self.start(run=lambda dlp: dlp.run(self.proc, entry_filter=lambda e, _: sizes.append(
+            (e.name, e.stat().st_size, e.is_file())) or True))
+        try:
+            self.wait_for(1)
+            write(os.path.join(self.indir, 'b.xml'), 'bb')
+            self.wait_for(2)
+        finally:
+            dlp.stop_watching()
+            thread.join(10)
+        self.assertEqual([('a.xml', 1, True), ('b.xml', 2, True)], sizes)
+
+    def test_workers_kept(self):
+        """ The workers and their contexts last from the first round to the end of the watch """
+        logfn = os.path.join(self.tmpdir.name, 'log')
+        init = partial(log_init, logfn)
+
+        def lines(kind):
+            if not os.path.exists(logfn):
+                return 0
+            with open(logfn) as f:
+                return sum(1 for line in f if line.strip() == kind)
+
+        runs = [('', lambda dlp: dlp.run(log_proc, initializer=init, finalizer=log_final), 1),
+                ('-j 2 --executor thread', lambda dlp: dlp.run(log_proc, initializer=init, finalizer=log_final), 2),
+                ('-j 2', lambda dlp: dlp.run(log_proc, initializer=init, finalizer=log_final), 2),
+                ('-j 2 --executor thread', lambda dlp: dlp.run_batched(log_batch, initializer=init,
+                                                                       finalizer=log_final), 2),
+                ('', lambda dlp: asyncio.run(dlp.run_async(log_proc_async, initializer=init, finalizer=log_final)),
+                 1)]
+        for args, run, nworkers in runs:
+            with self.subTest(args=args, run=run):
+                if os.path.exists(logfn):
+                    os.remove(logfn)
+                for fn in os.listdir(self.indir):
+                    os.remove(os.path.join(self.indir, fn))
+                write(os.path.join(self.indir, 'a.xml'), 'a', age=60)
+                dlp, thread, result = self.start(args, run)
+                try:
+                    for n, name in enumerate(['b.xml', 'c.xml', 'd.xml'], 1):
+                        deadline = time.monotonic() + 10
+                        while lines('proc') < n and time.monotonic() < deadline:
+                            time.sleep(0.02)
+                        write(os.path.join(self.indir, name), name)
+                    deadline = time.monotonic() + 10
+                    while lines('proc') < 4 and time.monotonic() < deadline:
+                        time.sleep(0.02)
+                finally:
+                    dlp.stop_watching()
+                    thread.join(10)
+                self.assertFalse(thread.is_alive())
+                self.assertEqual([(4, 4)], result)
+                self.assertEqual(4, lines('proc'))
+                self.assertLessEqual(1, lines('init'))
+                self.assertGreaterEqual(nworkers, lines('init'))
+                if args != '-j 2':
+                    # Process workers finalize their contexts as they exit
+                    self.assertEqual(lines('init'), lines('final'))
+
+    def test_stoponerror(self):
+        write(os.path.join(self.indir, 'bad.xml'), 'bad', age=60)
+        dlp, thread, result = self.start('-s')
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([(1, 0)], result)
+
+    def test_validation(self):
+        for args in ('--watch', '-id {} -i a.xml --watch', '-id {} --watch 0'):
+            dlp = DirectoryListProcessor(args.format(self.indir).split(), "Test", '.xml', '.foo', noexit=True)
+            self.assertFalse(dlp.successful_parse, args)
+
+
+class WatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.top = self.tmpdir.name
+        self.stop = threading.Event()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_settle(self):
+        """ A file that is still being written isn't reported until it has been left alone """
+        for use_inotify in (True, False):
+            path = os.path.join(self.top, 'x{}'.format(use_inotify))
+            write(path, 'a', age=60)
+            watcher = Watcher(self.top, interval=0.02, settle=0.3, use_inotify=use_inotify)
+            try:
+                self.assertEqual([path], [entry.path for entry in watcher.changes(self.stop)])
+                start = time.monotonic()
+                for n in range(5):
+                    write(path, 'a' * (n + 2))
+                    time.sleep(0.05)
+                self.assertEqual([path], [entry.path for entry in watcher.changes(self.stop)])
+                self.assertGreaterEqual(time.monotonic() - start, 0.5)
+            finally:
+                watcher.close()
+            os.remove(path)
+
+    def test_prune_and_hidden(self):
+        write(os.path.join(self.top, 'keep', 'a'), 'a', age=60)
+        write(os.path.join(self.top, 'skip', 'b'), 'b', age=60)
+        write(os.path.join(self.top, '.hidden', 'c'), 'c', age=60)
+        watcher = Watcher(self.top, prune_dir=lambda d: d == 'skip', settle=0)
+        try:
+            self.assertEqual([os.path.join(self.top, 'keep', 'a')], [e.path for e in watcher.changes(self.stop)])
+        finally:
+            watcher.close()
+
+    def test_stop(self):
+        watcher = Watcher(self.top, interval=0.02)
+        threading.Timer(0.1, self.stop.set).start()
+        try:
+            self.assertIsNone(watcher.changes(self.stop))
+        finally:
+            watcher.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+# Copyright (c) 2026, Mayo Clinic
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice, this
+#     list of conditions and the following disclaimer.
+#
+#     Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#     Neither the name of the Mayo Clinic nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, 
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+# OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+# OF THE POSSIBILITY OF SUCH DAMAGE.
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from dirlistproc import DirectoryListProcessor
+
+
+# Process pool hooks need to be picklable, so they live at module level and report through the file system
+def file_initializer(opts):
+    path = os.path.join(opts.statedir, 'init.{}'.format(os.getpid()))
+    open(path, 'w').close()
+    return {'pid': os.getpid(), 'ncalls': 0, 'statedir': opts.statedir}
+
+
+def file_finalizer(context):
+    with open(os.path.join(context['statedir'], 'final.{}'.format(context['pid'])), 'w') as f:
+        f.write(str(context['ncalls']))
+
+
+def context_proc(_, __, opts):
+    opts.worker_context['ncalls'] += 1
+    return opts.worker_context['pid'] == os.getpid()
+
+
+class WorkerContextTestCase(unittest.TestCase):
+    def setUp(self):
+        self.contexts = []
+        self.finalized = []
+        self.lock = threading.Lock()
+
+    def initializer(self, opts):
+        self.assertFalse(hasattr(opts, 'worker_context'))
+        context = {'thread': threading.get_ident(), 'ncalls': 0}
+        with self.lock:
+            self.contexts.append(context)
+        return context
+
+    def finalizer(self, context):
+        self.finalized.append(context)
+
+    def proc(self, _, __, opts):
+        opts.worker_context['ncalls'] += 1
+        return opts.worker_context['thread'] == threading.get_ident()
+
+    def test_serial(self):
+        dlp = DirectoryListProcessor("-id testfiles".split(), "Test", '.xml', ".foo")
+        self.assertEqual((4, 4), dlp.run(self.proc, initializer=self.initializer, finalizer=self.finalizer))
+        self.assertEqual([{'thread': threading.get_ident(), 'ncalls': 4}], self.contexts)
+        self.assertEqual(self.contexts, self.finalized)
+        self.assertFalse(hasattr(dlp.opts, 'worker_context'))
+
+    def test_threads(self):
+        dlp = DirectoryListProcessor("-id testfiles -j 3 --executor thread".split(), "Test", '.xml', ".foo")
+        self.assertEqual((4, 4), dlp.run(self.proc, initializer=self.initializer, finalizer=self.finalizer))
+        self.assertTrue(1 <= len(self.contexts) <= 3)
+        self.assertEqual(len(self.contexts), len({context['thread'] for context in self.contexts}))
+        self.assertEqual(4, sum(context['ncalls'] for context in self.contexts))
+        self.assertCountEqual([id(c) for c in self.contexts], [id(c) for c in self.finalized])
+        self.assertFalse(hasattr(dlp.opts, 'worker_context'))
+
+    def test_batched_and_async(self):
+        def batch_proc(pairs, opts):
+            opts.worker_context['ncalls'] += 1
+            return None
+
+        async def async_proc(_, __, opts):
+            opts.worker_context['ncalls'] += 1
+
+        dlp = DirectoryListProcessor("-id testfiles".split(), "Test", '.xml', ".foo")
+        self.assertEqual((4, 4), dlp.run_batched(batch_proc, 3, initializer=self.initializer))
+        self.assertEqual((4, 4), asyncio.run(dlp.run_async(async_proc, initializer=self.initializer,
+                                                           finalizer=self.finalizer)))
+        self.assertEqual([2, 4], [context['ncalls'] for context in self.contexts])
+        self.assertEqual(self.contexts[1:], self.finalized)
+
+    def test_processes(self):
+        with tempfile.TemporaryDirectory() as statedir:
+            def addargs(parser):
+                parser.add_argument("--statedir")
+
+            dlp = DirectoryListProcessor("-id testfiles -j 2 --statedir".split() + [statedir], "Test", '.xml', ".foo",
+                                         addargs=addargs)
+            self.assertEqual((4, 4), dlp.run(context_proc, initializer=file_initializer, finalizer=file_finalizer))
+            files = os.listdir(statedir)
+            inits = {fn.split('.')[1] for fn in files if fn.startswith('init.')}
+            finals = {fn.split('.')[1] for fn in files if fn.startswith('final.')}
+            self.assertTrue(1 <= len(inits) <= 2)
+            self.assertNotIn(str(os.getpid()), inits)
+            self.assertEqual(inits, finals)
+            ncalls = 0
+            for pid in finals:
+                with open(os.path.join(statedir, 'final.' + pid)) as f:
+                    ncalls += int(f.read())
+            self.assertEqual(4, ncalls)
+
+
+if __name__ == '__main__':
+    unittest.main()